@@ -0,0 +1,84 @@
+# Search-as-you-type suggestions for one dictionary column
+#
+# The suggestions for a prefix are the column's terms that start with it,
+# heaviest first, then alphabetically. The terms are those of the column's
+# WildcardIndex: its sorted term array puts every prefix's terms in one
+# contiguous run, so no entry is read from the store. A term weighs what
+# `usage` says (for Eald-vacha, how many entries use it as a word or root),
+# or else the number of entries it appears in.
+#
+# Short prefixes have long runs ('nə' starts an eighth of a large lexicon),
+# so the ranking of every prefix whose run is longer than DENSE terms is
+# precomputed; any other prefix is ranked by scanning its run, at most
+# DENSE terms. Either way a keystroke costs about the same at any lexicon
+# size. refresh() re-ranks the prefixes of terms changed by a reload.
+import heapq
+from bisect import bisect_left
+
+SUGGESTIONS = 8
+DENSE = 64
+# Sorts after any character, to turn a prefix into a range
+MAX_CHAR = '\U0010ffff'
+
+
+class Completer:
+    def __init__(self, wildcard, usage=None, limit=SUGGESTIONS):
+        self.wildcard = wildcard
+        self.usage = usage
+        self.limit = limit
+        self.dense = {}
+        self._rank_dense('', 0, len(wildcard.forward))
+
+    def weight(self, tid):
+        if self.usage is not None:
+            return self.usage.get(self.wildcard.terms[tid], 0)
+        return len(self.wildcard.term_rows[tid])
+
+    def _range(self, prefix):
+        keys = self.wildcard.forward
+        lo = bisect_left(keys, prefix)
+        return lo, bisect_left(keys, prefix + MAX_CHAR, lo)
+
+    # Best terms in forward[lo:hi], skipping terms a reload left without rows
+    def _rank(self, lo, hi):
+        keys, ids, rows = self.wildcard.forward, self.wildcard.forward_ids, self.wildcard.term_rows
+        best = heapq.nsmallest(self.limit, ((-self.weight(ids[i]), keys[i]) for i in range(lo, hi)
+                                            if rows[ids[i]]))
+        return [term for _, term in best]
+
+    # Rank `prefix` (run forward[lo:hi]) and, recursively, each longer
+    # prefix that still has more than DENSE terms
+    def _rank_dense(self, prefix, lo, hi):
+        keys = self.wildcard.forward
+        if prefix:
+            self.dense[prefix] = self._rank(lo, hi)
+        n = len(prefix) + 1
+        i = lo
+        while i < hi:
+            if len(keys[i]) < n:
+                i += 1
+                continue
+            child = keys[i][:n]
+            j = bisect_left(keys, child + MAX_CHAR, i, hi)
+            if j - i > DENSE:
+                self._rank_dense(child, i, j)
+            i = j
+
+    # Up to `limit` terms starting with `prefix`, best first
+    def suggest(self, prefix):
+        prefix = prefix.lstrip().lower()
+        if not prefix:
+            return []
+        ranked = self.dense.get(prefix)
+        if ranked is None:
+            ranked = self._rank(*self._range(prefix))
+        return ranked
+
+    # Re-rank the prefixes of `terms` after their rows or weights changed
+    def refresh(self, terms):
+        for prefix in {term[:n] for term in terms for n in range(1, len(term) + 1)}:
+            lo, hi = self._range(prefix)
+            if hi - lo > DENSE:
+                self.dense[prefix] = self._rank(lo, hi)
+            else:
+                self.dense.pop(prefix, None)
@@ -0,0 +1,108 @@
+# Equivalence check and timings of the in-memory and SQLite backends
+#
+#   python benchmarks/backends.py [--scales 1,10] [--queries 50]
+#
+# For each lexicon size (see lexicon.py) the same entries are opened from a
+# snapshot (in memory) and imported into a lexicon database (SQLite). The
+# same queries are run on both: exact and wildcard search in both
+# directions, fuzzy fallback, meanings, decomposition, glossing and keyword
+# search. Every result must be identical; the run fails (exit 1) on the
+# first difference. It also reports how long each backend takes to open
+# and to answer each kind of query.
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from dictionary_core import EN_TO_EV, EV_TO_EN, build_roots, build_term_index, load_snapshot, open_dictionary  # noqa: E402
+from entry_store import EntryStore  # noqa: E402
+from snapshot import snapshot_path, write_snapshot  # noqa: E402
+from sqlite_backend import import_entries  # noqa: E402
+from lexicon import synthesize  # noqa: E402
+from suite import sample_queries  # noqa: E402
+
+
+# {kind: [(label, fn(dictionary) -> comparable result), ...]}
+def checks(queries):
+    def search(q, direction):
+        def run(dictionary):
+            results, is_fuzzy = dictionary.search_results(q, direction)
+            return results.format(), is_fuzzy, results.translations()
+        return run
+
+    parts = sorted({p for w in queries['decompose'] for p in w.replace('/', '-').split('-') if p.strip()})
+    return {
+        'exact': [(q, search(q, EV_TO_EN)) for q in queries['exact']],
+        'prefix': [(q, search(q, d)) for q in queries['prefix'] for d in (EV_TO_EN, EN_TO_EV)],
+        'suffix': [(q, search(q, d)) for q in queries['suffix'] for d in (EV_TO_EN, EN_TO_EV)],
+        'infix': [(q, search(q, d)) for q in queries['infix'] + ['*abba*', '*ab*', '**']
+                  for d in (EV_TO_EN, EN_TO_EV)],
+        'fuzzy': [(q, search(q, EN_TO_EV)) for q in queries['fuzzy']],
+        'meaning': [(p, lambda dictionary, p=p: dictionary.meaning(p)) for p in parts],
+        'decompose': [(w, lambda dictionary, w=w: dictionary.decompose(w))
+                      for w in queries['decompose'] + queries['long']],
+        'gloss': [(line, lambda dictionary, line=line: [dictionary.gloss(w) for w in line.split()])
+                  for line in queries['text']],
+        'fulltext': [(q, lambda dictionary, q=q: dictionary.fulltext_results(q).format())
+                     for q in queries['keyword'] + queries['keywords']],
+    }
+
+
+def run_scale(real, scale, workdir, count, seed):
+    entries = synthesize(real, scale, seed)
+    xlsx = os.path.join(workdir, f'lexicon-{scale}x.xlsx')
+    with open(xlsx, 'wb') as f:
+        f.write(f'synthetic {scale}x lexicon'.encode())
+    store = EntryStore(entries)
+    write_snapshot(snapshot_path(xlsx), xlsx, entries, build_roots(store), build_term_index(store).tables())
+    database = os.path.join(workdir, f'lexicon-{scale}x.sqlite')
+    start = time.perf_counter()
+    import_entries(database, entries)
+    print(f"{scale}x ({len(entries)} entries), imported in {time.perf_counter() - start:.2f} s", flush=True)
+
+    backends = {}
+    for name, path in (('memory', xlsx), ('sqlite', database)):
+        start = time.perf_counter()
+        backends[name] = open_dictionary(path, decompositions=False)
+        print(f"  open {name:<24}{(time.perf_counter() - start) * 1000:>10.2f} ms", flush=True)
+
+    failures = 0
+    for kind, cases in checks(sample_queries(entries, count, seed)).items():
+        times = {}
+        results = {}
+        for name, dictionary in backends.items():
+            start = time.perf_counter()
+            results[name] = [fn(dictionary) for _, fn in cases]
+            times[name] = (time.perf_counter() - start) * 1000 / len(cases)
+        for (label, _), a, b in zip(cases, results['memory'], results['sqlite']):
+            if a != b:
+                failures += 1
+                print(f"  MISMATCH {kind} {label!r}:\n    memory {a!r}\n    sqlite {b!r}")
+        print(f"  {kind:<12}{len(cases):>6} queries  memory {times['memory']:>8.3f} ms  "
+              f"sqlite {times['sqlite']:>8.3f} ms", flush=True)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that the SQLite backend answers like the in-memory one.')
+    parser.add_argument('--xlsx', default=os.path.join(REPO, 'dictionary.xlsx'))
+    parser.add_argument('--scales', default='1,10', help="comma-separated multiples of the real size")
+    parser.add_argument('--queries', type=int, default=50, help="queries per kind")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    real = load_snapshot(args.xlsx).entries
+    failures = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in (int(s) for s in args.scales.split(',')):
+            failures += run_scale(real, scale, workdir, args.queries, args.seed)
+    print(f"FAILED: {failures} differences" if failures else "both backends gave identical results")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# Synthetic Eald-vacha lexicons for benchmarking, grown from the real dictionary
+#
+# Scale 1 is the real dictionary. At scale N the real entries are followed by
+# synthetic ones up to N times the size. New roots come from a character
+# bigram model of the real roots; entries combine them the way real ones do:
+# plain roots, '-'-compounds, unhyphenated compounds, 'nə'-negations and
+# '/'-alternates, glossed with real English words and occasional notes.
+import random
+
+# Entry shapes and their weights
+SHAPES = [('root', 35), ('compound', 25), ('joined', 15), ('negated', 10), ('alternates', 15)]
+
+
+class RootModel:
+    def __init__(self, roots, rng):
+        self.rng = rng
+        self.follow = {}
+        for root in roots:
+            chars = ['^', *root, '$']
+            for a, b in zip(chars, chars[1:]):
+                self.follow.setdefault(a, []).append(b)
+
+    # A new root of lo..hi characters
+    def make(self, lo=3, hi=8):
+        while True:
+            chars, ch = [], '^'
+            while len(chars) < hi:
+                ch = self.rng.choice(self.follow[ch])
+                if ch == '$':
+                    break
+                chars.append(ch)
+            if len(chars) >= lo:
+                return ''.join(chars)
+
+
+def real_roots(entries):
+    roots = set()
+    for _, word, _ in entries:
+        if not word:
+            continue
+        for alt in word.lower().split('/'):
+            for part in alt.split('-'):
+                part = part.strip()
+                if len(part) >= 3 and ' ' not in part:
+                    roots.add(part[2:] if part.startswith('nə') and len(part) > 4 else part)
+    return sorted(roots)
+
+
+# The real entries followed by synthetic ones, len(entries) * scale in all
+def synthesize(entries, scale, seed=0):
+    entries = list(entries)
+    total = len(entries) * scale
+    if total <= len(entries):
+        return entries
+    rng = random.Random(seed)
+    roots = real_roots(entries)
+    model = RootModel(roots, rng)
+    roots += [model.make() for _ in range(len(roots) * (scale - 1))]
+    english = sorted({w.strip() for e, _, _ in entries if e for w in e.split('/') if w.strip()})
+    notes = [n for _, _, n in entries if n]
+    note_rate = len(notes) / len(entries)
+    shapes, weights = zip(*SHAPES)
+
+    def form(shape):
+        if shape == 'root':
+            return rng.choice(roots)
+        if shape == 'compound':
+            return '-'.join(rng.choice(roots) for _ in range(rng.randint(2, 3)))
+        if shape == 'joined':
+            return ''.join(rng.choice(roots) for _ in range(rng.randint(2, 3)))
+        if shape == 'negated':
+            return 'nə' + rng.choice(roots)
+        return '/'.join(form(rng.choice(shapes[:4])) for _ in range(2))
+
+    while len(entries) < total:
+        word = form(rng.choices(shapes, weights)[0])
+        gloss = '/'.join(rng.sample(english, rng.randint(1, 3)))
+        note = rng.choice(notes) if rng.random() < note_rate else None
+        entries.append((gloss, word, note))
+    return entries
@@ -0,0 +1,146 @@
+# Load test for dictionary_server.py: latency percentiles and throughput
+#
+#   python benchmarks/loadtest.py [--connections N] [--requests N] [--pipeline N]
+#                                 [--mix search,fuzzy,meaning,decompose] [--url HOST:PORT]
+#
+# Without --url a server is started on a free local port for the run. Each
+# connection is kept alive and keeps up to --pipeline requests in flight.
+# Query words are drawn (with a fixed seed) from the dictionary itself.
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from dictionary_core import load_snapshot  # noqa: E402
+
+
+def build_targets(xlsx, mix, count, seed=0):
+    entries = load_snapshot(xlsx).entries
+    english = [e[0] for e in entries if e[0]]
+    eald = [e[1] for e in entries if e[1]]
+    rng = random.Random(seed)
+    makers = {
+        'search': lambda: f"/search?direction=en&q={quote(rng.choice(english))}",
+        'fuzzy': lambda: f"/fuzzy?direction=en&q={quote(rng.choice(english)[:-1] or 'a')}",
+        'meaning': lambda: f"/meaning?term={quote(rng.choice(eald))}",
+        'decompose': lambda: f"/decompose?word={quote(rng.choice(eald))}",
+        'compounds': lambda: f"/compounds?root={quote(rng.choice(eald)[:4])}",
+    }
+    return [makers[rng.choice(mix)]() for _ in range(count)]
+
+
+async def _read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+# Send `targets` over one connection, `depth` at a time; [(latency, status)]
+async def _client(host, port, targets, depth):
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = asyncio.Queue()
+    slots = asyncio.Semaphore(depth)
+    results = []
+
+    async def send():
+        for target in targets:
+            await slots.acquire()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('utf-8'))
+            await sent.put(time.perf_counter())
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    for _ in targets:
+        status = await _read_response(reader)
+        results.append((time.perf_counter() - await sent.get(), status))
+        slots.release()
+    await sender
+    writer.close()
+    return results
+
+
+async def load(host, port, targets, connections, depth):
+    shares = [targets[i::connections] for i in range(connections)]
+    start = time.perf_counter()
+    done = await asyncio.gather(*(_client(host, port, share, depth) for share in shares if share))
+    return [r for results in done for r in results], time.perf_counter() - start
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(host, port, server, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit("server exited during startup")
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    sys.exit("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the dictionary query server.')
+    parser.add_argument('--url', help="HOST:PORT of a running server (default: start one)")
+    parser.add_argument('--xlsx', default=os.path.join(REPO, 'dictionary.xlsx'))
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--pipeline', type=int, default=4, help="requests in flight per connection")
+    parser.add_argument('--mix', default='search,fuzzy,meaning,decompose',
+                        help="comma-separated endpoints to draw requests from")
+    parser.add_argument('--max-heavy', type=int, default=2, help="passed to a server started here")
+    args = parser.parse_args()
+
+    targets = build_targets(args.xlsx, args.mix.split(','), args.requests)
+    server = None
+    if args.url:
+        host, port = args.url.rsplit(':', 1)
+        port = int(port)
+    else:
+        host, port = '127.0.0.1', _free_port()
+        server = subprocess.Popen([sys.executable, os.path.join(REPO, 'dictionary_server.py'),
+                                   '--dictionary', args.xlsx, '--port', str(port),
+                                   '--max-heavy', str(args.max_heavy)],
+                                  stderr=subprocess.DEVNULL)
+        _wait_for(host, port, server)
+    try:
+        results, elapsed = asyncio.run(load(host, port, targets, args.connections, args.pipeline))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    errors = sum(1 for _, status in results if status != 200)
+    p50, p99 = statistics.quantiles(latencies, n=100)[49], statistics.quantiles(latencies, n=100)[98]
+    print(f"{len(results)} requests over {args.connections} connections "
+          f"(pipeline {args.pipeline}, mix {args.mix})")
+    print(f"throughput {len(results) / elapsed:,.0f} req/s   errors {errors}")
+    print(f"latency ms  p50 {p50:.2f}   p99 {p99:.2f}   max {latencies[-1]:.2f}")
+
+
+if __name__ == '__main__':
+    main()
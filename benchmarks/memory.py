@@ -0,0 +1,116 @@
+# Memory benchmark: the entry store against the pandas DataFrame it replaced
+#
+#   python benchmarks/memory.py [--scales 1,10,100]
+#
+# For each lexicon size (see lexicon.py) a fresh interpreter loads a snapshot,
+# builds one structure over it and drops the snapshot, then reports what the
+# structure retains, cell strings included (traced by tracemalloc). Also
+# reports the RSS cost of importing pandas compared with dictionary_core,
+# which no longer imports it. pandas is only needed for the comparison rows;
+# without it they are skipped.
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from dictionary_core import build_roots, build_term_index, load_snapshot  # noqa: E402
+from entry_store import EntryStore  # noqa: E402
+from snapshot import snapshot_path, write_snapshot  # noqa: E402
+from lexicon import synthesize  # noqa: E402
+
+# Run in a fresh interpreter: KiB retained by `build` over a loaded snapshot
+MEASURE = """
+import gc, sys, tracemalloc
+sys.path.insert(0, {repo!r})
+import dictionary_core
+{imports}
+
+gc.collect()
+tracemalloc.start()
+snap = dictionary_core.load_snapshot({xlsx!r})
+kept = {build}
+del snap
+gc.collect()
+traced, _ = tracemalloc.get_traced_memory()
+tracemalloc.stop()
+print(traced // 1024)
+"""
+
+STRUCTURES = {
+    'EntryStore': ("from entry_store import EntryStore",
+                   "EntryStore(snap.entries)"),
+    'DataFrame': ("import pandas as pd; from entry_store import COLUMNS",
+                  "pd.DataFrame(snap.entries, columns=list(COLUMNS))"),
+    # Everything a loaded Dictionary keeps: store, roots and all indexes
+    'Dictionary': ("", "dictionary_core.Dictionary(snap)"),
+}
+
+# RSS growth of importing one module in a fresh interpreter
+IMPORT = """
+import sys
+sys.path.insert(0, {repo!r})
+
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * {page} // 1024
+
+rss_before = rss()
+import {module}
+print(rss() - rss_before)
+"""
+
+
+def child(code):
+    out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True)
+    return int(out.stdout)
+
+
+def has_pandas():
+    return subprocess.run([sys.executable, '-c', 'import pandas'], capture_output=True).returncode == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the memory held by the entry store and a DataFrame.')
+    parser.add_argument('--xlsx', default=os.path.join(REPO, 'dictionary.xlsx'))
+    parser.add_argument('--scales', default='1,10,100', help="comma-separated multiples of the real size")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if not os.path.exists('/proc/self/statm'):
+        print("needs /proc (Linux) to read the process RSS")
+        return 1
+
+    page = os.sysconf('SC_PAGE_SIZE')
+    structures = dict(STRUCTURES)
+    if not has_pandas():
+        del structures['DataFrame']
+        print("pandas is not installed; skipping the DataFrame comparison")
+
+    print("import")
+    for module in ('dictionary_core', 'pandas') if 'DataFrame' in structures else ('dictionary_core',):
+        print(f"  {module:<20}{child(IMPORT.format(repo=REPO, page=page, module=module)):>12} KiB RSS", flush=True)
+
+    real = load_snapshot(args.xlsx).entries
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in (int(s) for s in args.scales.split(',')):
+            entries = synthesize(real, scale, args.seed)
+            # Snapshot stamped against a placeholder, as in suite.py; the
+            # children only read its entries
+            xlsx = os.path.join(workdir, f'lexicon-{scale}x.xlsx')
+            with open(xlsx, 'wb') as f:
+                f.write(f'synthetic {scale}x lexicon'.encode())
+            store = EntryStore(entries)
+            write_snapshot(snapshot_path(xlsx), xlsx, entries, build_roots(store), build_term_index(store).tables())
+            del store
+            print(f"{scale}x ({len(entries)} entries)")
+            for name, (imports, build) in structures.items():
+                kib = child(MEASURE.format(repo=REPO, imports=imports, xlsx=xlsx, build=build))
+                print(f"  {name:<20}{kib:>12} KiB", flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# Batched vs one-at-a-time similarity scoring
+#
+#   python benchmarks/scoring.py [--scales 1,10] [--queries 20]
+#
+# Times the code paths that score many candidates against one query, once
+# with batches going through similarity.py and once with every candidate
+# scored by difflib (as if MIN_BATCH were infinite), and checks that both
+# give identical results:
+#   ratios     queries against every term of a dictionary column
+#   fuzzy      fuzzy search with a low minimum score and a long result list
+# The run fails (exit 1) on the first difference.
+import argparse
+import difflib
+import os
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import similarity  # noqa: E402
+from dictionary_core import build_fuzzy_index, load_snapshot  # noqa: E402
+from entry_store import EntryStore  # noqa: E402
+from lexicon import synthesize  # noqa: E402
+from suite import sample_queries  # noqa: E402
+
+
+# {kind: (candidates scored per run, fn() -> comparable result)}
+def cases(store, queries):
+    fuzzy = build_fuzzy_index(store)
+    columns = [(queries['fuzzy'], fuzzy['English'].terms), (queries['exact'], fuzzy['Eald-vacha'].terms)]
+
+    def ratios():
+        result = []
+        for qs, column in columns:
+            for q in qs:
+                if similarity.MIN_BATCH == sys.maxsize:
+                    result.append([difflib.SequenceMatcher(None, q, t).ratio() for t in column])
+                else:
+                    result.append(similarity.Similarity(q).ratios(column).tolist())
+        return result
+
+    return {
+        'ratios': (sum(len(qs) * len(column) for qs, column in columns), ratios),
+        'fuzzy': (None, lambda: [fuzzy['English'].search(q, 30, 200) for q in queries['fuzzy']]),
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_scale(real, scale, count, seed):
+    entries = synthesize(real, scale, seed)
+    print(f"{scale}x ({len(entries)} entries)", flush=True)
+    failures = 0
+    for kind, (candidates, fn) in cases(EntryStore(entries), sample_queries(entries, count, seed)).items():
+        batched, batched_ms = timed(fn)
+        similarity.MIN_BATCH, min_batch = sys.maxsize, similarity.MIN_BATCH
+        try:
+            single, single_ms = timed(fn)
+        finally:
+            similarity.MIN_BATCH = min_batch
+        if batched != single:
+            failures += 1
+            print(f"  MISMATCH {kind}")
+        size = f"{candidates:>9} candidates" if candidates is not None else ' ' * 20
+        print(f"  {kind:<10}{size}  difflib {single_ms:>9.1f} ms  batched {batched_ms:>9.1f} ms  "
+              f"x{single_ms / max(batched_ms, 1e-9):.1f}", flush=True)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare batched and one-at-a-time similarity scoring.')
+    parser.add_argument('--xlsx', default=os.path.join(REPO, 'dictionary.xlsx'))
+    parser.add_argument('--scales', default='1,10', help="comma-separated multiples of the real size")
+    parser.add_argument('--queries', type=int, default=20, help="queries per kind")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    real = load_snapshot(args.xlsx).entries
+    failures = sum(run_scale(real, int(scale), args.queries, args.seed) for scale in args.scales.split(','))
+    print(f"FAILED: {failures} differences" if failures else "batched and difflib scores are identical")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
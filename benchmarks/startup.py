@@ -0,0 +1,64 @@
+# Startup benchmark: time to a loaded dictionary, from a fresh interpreter
+#
+#   python benchmarks/startup.py [--runs N] [--xlsx PATH]
+#
+# cold      no snapshot: import dictionary.py, parse the xlsx, compile the snapshot
+# warm      snapshot present: import dictionary.py, load the snapshot
+# snapshot  snapshot present: import snapshot.py only (no pandas, openpyxl, tkinter)
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOAD_APP = (
+    "import sys; sys.path.insert(0, {repo!r}); import dictionary, dictionary_core; "
+    "assert dictionary_core.load_snapshot({xlsx!r}) is not None"
+)
+LOAD_SNAPSHOT = (
+    "import sys; sys.path.insert(0, {repo!r}); import snapshot; "
+    "assert snapshot.read_snapshot(snapshot.snapshot_path({xlsx!r}), {xlsx!r}) is not None"
+)
+
+
+def run(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare cold and warm dictionary start times.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--xlsx', default=os.path.join(REPO, 'dictionary.xlsx'))
+    args = parser.parse_args()
+
+    # Work on a copy so the benchmark never touches the real snapshot
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx = os.path.join(tmp, 'dictionary.xlsx')
+        shutil.copy2(args.xlsx, xlsx)
+        snap = os.path.splitext(xlsx)[0] + '.evsnap'
+        app = LOAD_APP.format(repo=REPO, xlsx=xlsx)
+
+        timings = {'cold': [], 'warm': [], 'snapshot': []}
+        for _ in range(args.runs):
+            if os.path.exists(snap):
+                os.remove(snap)
+            timings['cold'].append(run(app))
+            timings['warm'].append(run(app))
+            timings['snapshot'].append(run(LOAD_SNAPSHOT.format(repo=REPO, xlsx=xlsx)))
+
+    print(f"{'start':<10}{'min (s)':>10}{'median (s)':>12}")
+    for name, values in timings.items():
+        print(f"{name:<10}{min(values):>10.3f}{statistics.median(values):>12.3f}")
+    cold, warm = statistics.median(timings['cold']), statistics.median(timings['warm'])
+    print(f"warm start is {cold / warm:.1f}x faster than cold")
+
+
+if __name__ == '__main__':
+    main()
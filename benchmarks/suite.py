@@ -0,0 +1,230 @@
+# Benchmark suite over synthetic lexicons at several multiples of the real size
+#
+#   python benchmarks/suite.py [--scales 1,10,100] [--update-baseline]
+#
+# For each scale (see lexicon.py) it times the load, index, search and
+# decomposition paths and records their peak traced memory, then compares
+# the results with benchmarks/baseline.json. The run fails (exit 1) when an
+# operation got slower or hungrier than the baseline by more than the
+# tolerances, or grows faster with the lexicon size than it did (time at
+# scale N relative to scale 1; this check holds across machines).
+# Lexicons are written as snapshots only (an .xlsx can't even hold 1000x),
+# so load_dictionary is measured on the snapshot path. 1000x is supported
+# (--scales 1,10,100,1000) but takes several GB and tens of minutes, so it is
+# not part of the default run.
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from dictionary_core import (EN_TO_EV, EV_TO_EN, Dictionary, build_roots,  # noqa: E402
+                             build_term_index, decompose_word, find_possible_decompositions,
+                             load_dictionary, load_snapshot, search_fulltext, search_fuzzy,
+                             search_word_exact_wildcard)
+from entry_store import EntryStore  # noqa: E402
+from snapshot import snapshot_path, write_snapshot  # noqa: E402
+from interlinear import interlinear  # noqa: E402
+from lexicon import synthesize  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+FUZZY_SCORES = (60, 75, 90)
+MIN_TIMING = 0.25
+
+
+# Sample queries for each operation, drawn from the lexicon
+def sample_queries(entries, count, seed=0):
+    rng = random.Random(seed)
+    words = [a.strip() for _, w, _ in entries if w for a in w.split('/') if len(a.strip()) >= 5]
+    english = [a.strip() for e, _, _ in entries if e for a in e.split('/') if len(a.strip()) >= 4]
+    picks = rng.sample(words, count)
+    long_words = [w for w in words if len(w) > 10 and '-' not in w and not w.startswith('nə')]
+    # Running text: words drawn with Zipf-like frequencies, 12 to a line
+    vocabulary = rng.sample(words, min(len(words), 500))
+    text = rng.choices(vocabulary, [1 / (i + 1) for i in range(len(vocabulary))], k=count * 60)
+    # Definitions of two or more words, for keyword queries that match
+    phrases = [e.split() for e, _, _ in entries if e and len(e.split()) >= 2]
+
+    def typo(w):
+        i = rng.randrange(len(w))
+        return w[:i] + rng.choice('aeiou') + w[i + 1:]
+
+    return {
+        'exact': picks,
+        'prefix': [w[:3] + '*' for w in picks],
+        'suffix': ['*' + w[-3:] for w in picks],
+        'infix': ['*' + w[1:4] + '*' for w in picks],
+        'fuzzy': [typo(e) for e in rng.sample(english, count)],
+        'keyword': [rng.choice(words).strip('/') for words in rng.sample(phrases, count)],
+        'keywords': [' '.join(rng.sample(words, 2)).replace('/', ' ') for words in rng.sample(phrases, count)],
+        'long': rng.sample(long_words, min(count, len(long_words))),
+        'decompose': rng.sample([w for _, w, _ in entries if w], count),
+        'text': [' '.join(text[i:i + 12]) for i in range(0, len(text), 12)],
+    }
+
+
+# {name: fn()} for the lexicon whose snapshot is at xlsx's snapshot path
+def operations(xlsx, queries):
+    snap = load_snapshot(xlsx)
+    dictionary = Dictionary(snap)
+    store, roots, index = dictionary.store, dictionary.roots, dictionary.index
+    wildcard, fuzzy, fulltext = dictionary.wildcard, dictionary.fuzzy, dictionary.fulltext
+
+    def search(kind):
+        return lambda: [search_word_exact_wildcard(store, q, EV_TO_EN, wildcard) for q in queries[kind]]
+
+    def fuzzy_search(score):
+        return lambda: [search_fuzzy(store, q, EN_TO_EV, score, fuzzy=fuzzy) for q in queries['fuzzy']]
+
+    ops = {
+        'load_dictionary': lambda: load_dictionary(xlsx),
+        'build_roots': lambda: build_roots(store),
+        'build_indexes': lambda: Dictionary(snap),
+    }
+    for kind in ('exact', 'prefix', 'suffix', 'infix'):
+        ops[f'search_{kind}'] = search(kind)
+    for score in FUZZY_SCORES:
+        ops[f'search_fuzzy_{score}'] = fuzzy_search(score)
+    ops['search_fulltext'] = lambda: [search_fulltext(store, q, 50, fulltext) for q in queries['keyword']]
+    ops['search_fulltext_and'] = lambda: [search_fulltext(store, q, 50, fulltext) for q in queries['keywords']]
+    ops['find_possible_decompositions'] = lambda: [find_possible_decompositions(w, store, roots, index)
+                                                   for w in queries['long']]
+    ops['decompose_word'] = lambda: [decompose_word(w, store, roots=roots, index=index)
+                                     for w in queries['decompose']]
+
+    # From a cold cache each run, so repeated words are glossed once per run
+    def gloss_text():
+        dictionary.cache.clear()
+        return list(interlinear(queries['text'], dictionary.gloss))
+    ops['gloss_text'] = gloss_text
+
+    # Suggestions for every keystroke of typing each word, also after Alt+P
+    typed = ([(w[:i], EV_TO_EN) for w in queries['exact'] for i in range(1, len(w) + 1)] +
+             [('nə' + w[:i], EV_TO_EN) for w in queries['exact'] for i in range(len(w) + 1)] +
+             [(w[:i], EN_TO_EV) for w in queries['keyword'] for i in range(1, len(w) + 1)])
+    ops['suggest_keystrokes'] = lambda: [dictionary.suggest(text, direction) for text, direction in typed]
+    return ops
+
+
+# (best time in ms, peak traced memory in KiB of one more run). Fast
+# operations are repeated until MIN_TIMING seconds have been spent, for at
+# least `rounds` runs; operations taking over a second are timed once.
+def measure(fn, rounds):
+    best, spent, runs = float('inf'), 0.0, 0
+    while runs < rounds or spent < MIN_TIMING:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best, spent, runs = min(best, elapsed), spent + elapsed, runs + 1
+        if best > 1.0:
+            break
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(best * 1000, 3), peak // 1024
+
+
+def run_scale(real, scale, workdir, rounds, count, seed):
+    entries = synthesize(real, scale, seed)
+    # A placeholder spreadsheet the snapshot is stamped against, so it is
+    # always current and never parsed
+    xlsx = os.path.join(workdir, f'lexicon-{scale}x.xlsx')
+    with open(xlsx, 'wb') as f:
+        f.write(f'synthetic {scale}x lexicon'.encode())
+    store = EntryStore(entries)
+    write_snapshot(snapshot_path(xlsx), xlsx, entries, build_roots(store), build_term_index(store).tables())
+    queries = sample_queries(entries, count, seed)
+    results = {}
+    for name, fn in operations(xlsx, queries).items():
+        ms, peak_kib = measure(fn, rounds)
+        results[name] = {'ms': ms, 'peak_kib': peak_kib}
+        print(f"  {name:<30}{ms:>12.2f} ms{peak_kib:>12} KiB", flush=True)
+    os.remove(snapshot_path(xlsx))
+    os.remove(xlsx)
+    return {'entries': len(entries), 'ops': results}
+
+
+# Regressions of `current` against `baseline`, as messages
+def compare(current, baseline, time_tol, memory_tol, scaling_tol, floor_ms):
+    failures = []
+    base_scales = baseline['scales']
+    for scale, result in current['scales'].items():
+        base = base_scales.get(scale)
+        if base is None:
+            continue
+        for name, now in result['ops'].items():
+            was = base['ops'].get(name)
+            if was is None:
+                continue
+            if now['ms'] > was['ms'] * time_tol and now['ms'] - was['ms'] > floor_ms:
+                failures.append(f"{scale}x {name}: {now['ms']:.2f} ms, baseline {was['ms']:.2f} ms")
+            if now['peak_kib'] > was['peak_kib'] * memory_tol and now['peak_kib'] - was['peak_kib'] > 256:
+                failures.append(f"{scale}x {name}: peak {now['peak_kib']} KiB, baseline {was['peak_kib']} KiB")
+            unit_now = current['scales'].get('1', {}).get('ops', {}).get(name)
+            unit_was = base_scales.get('1', {}).get('ops', {}).get(name)
+            if scale != '1' and unit_now and unit_was and now['ms'] > floor_ms:
+                growth = now['ms'] / max(unit_now['ms'], floor_ms)
+                base_growth = was['ms'] / max(unit_was['ms'], floor_ms)
+                if growth > base_growth * scaling_tol:
+                    failures.append(f"{scale}x {name}: {growth:.1f}x the 1x time, baseline {base_growth:.1f}x")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time and measure the dictionary at several lexicon sizes.')
+    parser.add_argument('--xlsx', default=os.path.join(REPO, 'dictionary.xlsx'))
+    parser.add_argument('--scales', default='1,10,100', help="comma-separated multiples of the real size")
+    parser.add_argument('--rounds', type=int, default=3, help="minimum timed runs per operation (best is kept)")
+    parser.add_argument('--queries', type=int, default=20, help="queries per search/decompose operation")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--output', help="also write this run's results to this JSON file")
+    parser.add_argument('--time-tolerance', type=float, default=2.0,
+                        help="fail when an operation takes more than this times the baseline")
+    parser.add_argument('--memory-tolerance', type=float, default=1.25)
+    parser.add_argument('--scaling-tolerance', type=float, default=2.0,
+                        help="fail when an operation's growth over 1x exceeds the baseline's by this factor")
+    parser.add_argument('--floor-ms', type=float, default=5.0,
+                        help="ignore times and differences below this many ms (timer noise)")
+    args = parser.parse_args()
+
+    real = load_snapshot(args.xlsx).entries
+    current = {'python': platform.python_version(), 'machine': platform.machine(), 'scales': {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in (int(s) for s in args.scales.split(',')):
+            print(f"{scale}x", flush=True)
+            current['scales'][str(scale)] = run_scale(real, scale, workdir, args.rounds, args.queries, args.seed)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    failures = compare(current, baseline, args.time_tolerance, args.memory_tolerance,
+                       args.scaling_tolerance, args.floor_ms)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    print("FAILED" if failures else "no regressions against the baseline")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
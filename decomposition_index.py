@@ -0,0 +1,103 @@
+# Precomputed decompositions of every dictionary entry
+#
+# Built offline (dictionary_cli.py build-decompositions) and stored as JSON
+# next to the dictionary. It holds the decompose_word() text of every
+# Eald-vacha entry, plus a reverse index from each root to the words built
+# from it, ranked by segmentation score. Like the snapshot, it is tied to the
+# sha256 of the spreadsheet it was built from and ignored once that changes.
+import json
+import os
+
+from snapshot import file_digest
+
+DECOMPOSITION_INDEX_VERSION = 1
+DECOMPOSITION_INDEX_SUFFIX = '.decomp.json'
+
+
+class DecompositionIndex:
+    def __init__(self, decompositions, compounds):
+        # decompositions: {word: decompose_word() output}
+        # compounds:      {root: [(score, word, english), ...]}, best first
+        self.decompositions = decompositions
+        self.compounds_by_root = compounds
+
+    # Merge per-entry analyses (word, decomposition, [(root, score), ...], english)
+    @classmethod
+    def from_analyses(cls, analyses):
+        decompositions = {}
+        best = {}
+        for word, decomposition, credits, english in analyses:
+            decompositions[word] = decomposition
+            for root, score in credits:
+                words = best.setdefault(root, {})
+                if score > words.get(word, (-1,))[0]:
+                    words[word] = (score, english)
+        compounds = {
+            root: sorted(((score, word, english) for word, (score, english) in words.items()), key=_rank)
+            for root, words in best.items()
+        }
+        return cls(decompositions, compounds)
+
+    # Merge analyses of words not in the index (discard() them first)
+    def add(self, analyses):
+        other = DecompositionIndex.from_analyses(analyses)
+        self.decompositions.update(other.decompositions)
+        for root, items in other.compounds_by_root.items():
+            self.compounds_by_root[root] = sorted(self.compounds_by_root.get(root, []) + items, key=_rank)
+
+    # Forget everything known about `words`
+    def discard(self, words):
+        words = set(words)
+        for word in words:
+            self.decompositions.pop(word, None)
+        for root, items in list(self.compounds_by_root.items()):
+            kept = [item for item in items if item[1] not in words]
+            if not kept:
+                del self.compounds_by_root[root]
+            elif len(kept) < len(items):
+                self.compounds_by_root[root] = kept
+
+    def decomposition(self, word):
+        return self.decompositions.get(word)
+
+    # Words built from `root`, best-scoring first
+    def compounds(self, root):
+        return self.compounds_by_root.get(root.strip().lower(), [])
+
+
+def _rank(item):
+    score, word, _ = item
+    return -score, word
+
+
+def decomposition_index_path(source):
+    return os.path.splitext(source)[0] + DECOMPOSITION_INDEX_SUFFIX
+
+
+def write_decomposition_index(path, source, index):
+    data = {
+        'version': DECOMPOSITION_INDEX_VERSION,
+        'source_sha256': file_digest(source).hex(),
+        'decompositions': index.decompositions,
+        'compounds': index.compounds_by_root,
+    }
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# Load the index; None when missing, unreadable, of another version, or
+# built from a different spreadsheet
+def read_decomposition_index(path, source):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != DECOMPOSITION_INDEX_VERSION:
+        return None
+    if os.path.exists(source) and file_digest(source).hex() != data.get('source_sha256'):
+        return None
+    compounds = {root: [tuple(item) for item in items] for root, items in data['compounds'].items()}
+    return DecompositionIndex(data['decompositions'], compounds)
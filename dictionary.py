@@ -1,244 +1,20 @@
-import pandas as pd
 import tkinter as tk
 from tkinter import ttk, messagebox
 import pyperclip
-import difflib
-import sys
-import os
 import webbrowser
-
-# Helper for PyInstaller / dev paths
-def resource_path(relative_path):
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-# Load dictionary
-def load_dictionary(file_path='dictionary.xlsx'):
-    file_path = resource_path(file_path)
-    try:
-        df = pd.read_excel(file_path)
-        df.columns = ['English', 'Eald-vacha', 'Notes'] if len(df.columns) == 3 else df.columns
-        return df
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to load dictionary: {e}")
-        return None
-
-# Pre-build all possible root terms
-def build_roots(df):
-    roots = set()
-    for entry in df['Eald-vacha']:
-        alts = [a.strip().lower() for a in str(entry).split('/')]
-        for alt in alts:
-            parts = [p.strip().lower() for p in alt.split('-') if p.strip()]
-            roots.update(parts)
-            roots.add(alt)
-    return roots
-
-# Get meaning for a term
-def get_meaning(term, df):
-    term_lower = term.lower()
-    match = df[df['Eald-vacha'].str.lower() == term_lower]
-    if not match.empty:
-        return match['English'].values[0]
-    for _, row in df.iterrows():
-        alts = [a.strip().lower() for a in str(row['Eald-vacha']).split('/')]
-        for alt in alts:
-            parts = [p.strip().lower() for p in alt.split('-') if p.strip()]
-            if term_lower in parts or term_lower == alt:
-                return row['English']
-    return "[unknown]"
-
-# Find all segmentations
-def find_segmentations(word_lower, roots, start=0, path=None):
-    if path is None:
-        path = []
-    if start == len(word_lower):
-        return [path[:]] if len(path) >= 2 else []
-    segmentations = []
-    for end in range(start + 3, len(word_lower) + 1):
-        prefix = word_lower[start:end]
-        if prefix in roots:
-            path.append((start, end, word_lower[start:end]))
-            segmentations.extend(find_segmentations(word_lower, roots, end, path))
-            path.pop()
-    return segmentations
-
-# Score a segmentation
-def score_segmentation(seg, word_lower, df, actual_eng):
-    num_parts = len(seg)
-    coverage = sum(end - start for start, end, _ in seg) / len(word_lower)
-    if coverage < 0.9:
-        return 0
-    composed = " ".join(get_meaning(p, df) for _, _, p in seg).lower()
-    sim = difflib.SequenceMatcher(None, composed, actual_eng.lower()).ratio()
-    score = (sim * 80) + (num_parts * 10) + (coverage * 10)
-    return score
-
-# Possible decompositions
-def find_possible_decompositions(word, df, roots):
-    word_lower = word.lower()
-    match = df[df['Eald-vacha'].str.lower() == word_lower]
-    actual_eng = match['English'].values[0] if not match.empty else ""
-    segmentations = find_segmentations(word_lower, roots)
-    if not segmentations:
-        return "No possible decompositions found."
-    scored = []
-    for seg in segmentations:
-        score = score_segmentation(seg, word_lower, df, actual_eng)
-        if score > 25:
-            parts_str = " + ".join(f"{p}: {get_meaning(p, df)}" for _, _, p in seg)
-            scored.append((score, parts_str))
-    if not scored:
-        return "No high-confidence decompositions."
-    scored.sort(reverse=True)
-    output = ""
-    for i, (score, decomp) in enumerate(scored[:3], 1):
-        output += f"{i}. (score: {int(score)}%) {decomp}\n"
-    return output
-
-# Decomposition
-def decompose_word(word, df, indent=0, visited=None, roots=None):
-    if visited is None:
-        visited = set()
-    if roots is None:
-        roots = build_roots(df)
-    word_lower = word.lower()
-    if word_lower in visited:
-        return f"{'  ' * indent}{word}: [cycle detected]"
-    visited.add(word_lower)
-    indent_str = '  ' * indent
-    output = []
-    if '-' in word:
-        parts = [p.strip() for p in word.split('-')]
-        decomp_parts = []
-        for p in parts:
-            sub = decompose_word(p, df, indent + 1, visited.copy(), roots)
-            decomp_parts.append(sub)
-        match = df[df['Eald-vacha'].str.lower() == word_lower]
-        meaning = ""
-        if not match.empty:
-            eng = match['English'].values[0]
-            notes = f" ({match['Notes'].values[0]})" if pd.notna(match['Notes'].values[0]) else ""
-            meaning = f" → {eng}{notes}"
-        output.append(f"{indent_str}{word} (compound){meaning}:\n" + '\n'.join(decomp_parts))
-        return '\n'.join(output)
-    if '/' in word:
-        parts = [p.strip() for p in word.split('/')]
-        decomp_parts = [decompose_word(p, df, indent, visited.copy(), roots) for p in parts]
-        return '\n'.join(decomp_parts)
-    if word_lower.startswith('nə'):
-        base = word[2:].strip()
-        if base:
-            sub = decompose_word(base, df, indent + 1, visited.copy(), roots)
-            output.append(f"{indent_str}{word} (negation prefix):\n{indent_str}  nə: not / negation / without\n{sub}")
-            return '\n'.join(output)
-    atomic_meaning = ""
-    match = df[df['Eald-vacha'].str.lower() == word_lower]
-    if not match.empty:
-        eng = match['English'].values[0]
-        notes = f" ({match['Notes'].values[0]})" if pd.notna(match['Notes'].values[0]) else ""
-        atomic_meaning = f"{indent_str}{word}: {eng}{notes}"
-    else:
-        for _, row in df.iterrows():
-            terms = [t.strip().lower() for t in str(row['Eald-vacha']).split('/')]
-            if word_lower in terms:
-                eng = row['English']
-                notes = f" ({row['Notes']})" if pd.notna(row['Notes']) else ""
-                atomic_meaning = f"{indent_str}{word}: {eng}{notes}"
-                break
-    if atomic_meaning:
-        output.append(atomic_meaning)
-    else:
-        output.append(f"{indent_str}{word}: [not found]")
-    if len(word) > 6 and '-' not in word and '/' not in word and not word_lower.startswith('nə'):
-        possible = find_possible_decompositions(word, df, roots)
-        if possible and "No" not in possible:
-            output.append(f"{indent_str}Possible compound word roots:\n{possible}")
-    return '\n'.join(output)
-
-# Search functions
-def search_word_exact_wildcard(df, query, direction):
-    results = []
-    original_query = query.strip()
-    q = original_query.lower()
-    if direction == 'English to Eald-vacha':
-        search_col, result_col = 'English', 'Eald-vacha'
-    else:
-        search_col, result_col = 'Eald-vacha', 'English'
-    starts_star = q.startswith('*')
-    ends_star = q.endswith('*')
-    if starts_star and ends_star:
-        match_str = q[1:-1].strip()
-        match_func = lambda t: match_str in t
-    elif starts_star:
-        match_str = q[1:].strip()
-        match_func = lambda t: t.endswith(match_str)
-    elif ends_star:
-        match_str = q[:-1].strip()
-        match_func = lambda t: t.startswith(match_str)
-    else:
-        match_str = q.strip()
-        match_func = lambda t: t == match_str
-    exclude_terms = ["habban", "amabba"]
-    trigger = "abba"
-    is_wildcard = starts_star or ends_star
-    trigger_in_pattern = trigger in match_str
-    pattern_has_excluded_term = any(excl in match_str for excl in exclude_terms)
-    apply_exclusion = is_wildcard and trigger_in_pattern and not pattern_has_excluded_term
-    for _, row in df.iterrows():
-        terms = [t.strip().lower() for t in str(row[search_col]).split('/')]
-        matched = False
-        for term in terms:
-            if apply_exclusion and any(excl in term for excl in exclude_terms):
-                continue
-            if match_func(term):
-                matched = True
-                break
-        if matched:
-            trans = row[result_col]
-            notes = row['Notes'] if pd.notna(row['Notes']) else "No notes available."
-            results.append(
-                f"Match found for '{original_query}' in '{row[search_col]}':\n"
-                f"{result_col}: {trans}\n"
-                f"Notes: {notes}\n"
-            )
-    return results
-
-def search_fuzzy(df, query, direction, min_score=75, limit=4):
-    q_clean = query.strip().lower()
-    if not q_clean:
-        return []
-    if direction == 'English to Eald-vacha':
-        search_col, result_col = 'English', 'Eald-vacha'
-    else:
-        search_col, result_col = 'Eald-vacha', 'English'
-    candidates = []
-    for _, row in df.iterrows():
-        terms = [t.strip() for t in str(row[search_col]).split('/')]
-        for term in terms:
-            score = difflib.SequenceMatcher(None, q_clean, term.lower()).ratio() * 100
-            if score >= min_score:
-                candidates.append((score, term, row[result_col], row['Notes'], row[search_col]))
-    candidates.sort(key=lambda x: x[0], reverse=True)
-    seen_rows = set()
-    results = []
-    for score, term, trans, notes_raw, orig_entry in candidates:
-        row_id = id(orig_entry)
-        if row_id in seen_rows:
-            continue
-        seen_rows.add(row_id)
-        notes = notes_raw if pd.notna(notes_raw) else "No notes available."
-        results.append(
-            f"**Fuzzy match** (score: {int(score)}%): '{term}' in '{orig_entry}'\n"
-            f"{result_col}: {trans}\n"
-            f"Notes: {notes}\n"
-        )
-        if len(results) >= limit:
-            break
-    return results
+import sys
+import threading
+from dictionary_core import Dictionary
+from autocomplete import SUGGESTIONS
+from query_executor import QueryExecutor
+
+# Results rendered per page in the output widget
+PAGE_SIZE = 50
+RESULT_SEPARATOR = "\n---\n"
+# How often to check dictionary.xlsx for edits
+RELOAD_POLL_MS = 2000
+# Pause in typing before the suggestions are updated
+SUGGEST_DELAY_MS = 80
 
 # GUI with Help menu and keyboard shortcuts
 class DictionaryApp:
@@ -247,11 +23,12 @@ class DictionaryApp:
         self.root.title("Bilingual Dictionary: English ↔ Eald-vacha")
         self.root.geometry("750x700")
 
-        self.df = load_dictionary()
-        if self.df is None:
-            self.root.quit()
-
-        self.roots = build_roots(self.df)
+        try:
+            self.dictionary = Dictionary.load()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load dictionary: {e}")
+            self.root.destroy()
+            sys.exit(1)
 
         self.last_results = []
         self.last_direction = ''
@@ -269,16 +46,31 @@ class DictionaryApp:
         input_frame = ttk.Frame(root)
         input_frame.pack(pady=10, padx=15, fill='x')
         ttk.Label(input_frame, text="Search (wildcards * supported):").pack(side='left', padx=(0, 10))
-        self.entry = ttk.Entry(input_frame, width=55, font=('Consolas', 11))
+        self.query_var = tk.StringVar()
+        self.entry = ttk.Entry(input_frame, width=55, font=('Consolas', 11), textvariable=self.query_var)
         self.entry.pack(side='left', expand=True, fill='x')
         self.entry.focus_set()
 
+        # Suggestions as you type, in a list dropped below the search box.
+        # Every edit (typing, pasting, Alt+P) restarts a short timer, and the
+        # list is only updated once typing pauses.
+        self.suggestions = tk.Listbox(root, height=SUGGESTIONS, font=('Consolas', 11), activestyle='none')
+        self.suggest_job = None
+        # Held while a reload changes the indexes the suggestions read
+        self.reload_lock = threading.Lock()
+        self.query_var.trace_add('write', lambda *args: self.schedule_suggestions())
+
         # Direction
         dir_frame = ttk.Frame(root)
         dir_frame.pack(pady=5)
         self.direction = tk.StringVar(value='English to Eald-vacha')
+        self.direction.trace_add('write', lambda *args: self.schedule_suggestions())
         ttk.Radiobutton(dir_frame, text="English → Eald-vacha", variable=self.direction, value='English to Eald-vacha').pack(side='left', padx=12)
         ttk.Radiobutton(dir_frame, text="Eald-vacha → English", variable=self.direction, value='Eald-vacha to English').pack(side='left', padx=12)
+        # Keyword search over the English definitions and notes instead
+        self.definitions_var = tk.BooleanVar(value=False)
+        self.definitions_var.trace_add('write', lambda *args: self.schedule_suggestions())
+        ttk.Checkbutton(dir_frame, text="Search definitions (Alt+F)", variable=self.definitions_var).pack(side='left', padx=12)
 
         # Fuzzy tolerance slider
         fuzzy_frame = ttk.Frame(root)
@@ -304,6 +96,22 @@ class DictionaryApp:
         self.decomp_btn.pack(side='left', padx=5)
         # NEW button: Add nə
         ttk.Button(btn_frame, text="Add nə (Alt+P)", command=self.insert_nə).pack(side='left', padx=5)
+        ttk.Button(btn_frame, text="Words with root (Alt+R)", command=self.perform_compounds).pack(side='left', padx=5)
+
+        # Status bar: busy indicator while a query runs in the background
+        status_frame = ttk.Frame(root)
+        status_frame.pack(side='bottom', fill='x', padx=15, pady=(0, 8))
+        self.progress = ttk.Progressbar(status_frame, mode='indeterminate', length=120)
+        self.progress.pack(side='right')
+        self.status_label = ttk.Label(status_frame, text="")
+        self.status_label.pack(side='left')
+        self.more_btn = ttk.Button(status_frame, text="More results (Alt+M)", command=self.render_more, state='disabled')
+        self.more_btn.pack(side='right', padx=10)
+        self.timing_label = ttk.Label(status_frame, text="", foreground='gray')
+        self.timing_label.pack(side='right', padx=10)
+        self.executor = QueryExecutor(self.root, self.set_busy, self.show_timing)
+        # Pick up edits to the spreadsheet without a restart
+        self.root.after(RELOAD_POLL_MS, self.check_for_edits)
 
         # Output
         self.output = tk.Text(root, height=22, width=85, wrap='word', font=('Consolas', 10))
@@ -311,9 +119,19 @@ class DictionaryApp:
 
         scrollbar = ttk.Scrollbar(root, orient='vertical', command=self.output.yview)
         scrollbar.pack(side='right', fill='y')
-        self.output.configure(yscrollcommand=scrollbar.set)
 
+        # Load the next page when the user scrolls near the end of the results
+        def on_output_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) > 0.9 and self.rendered < len(self.last_results):
+                self.root.after_idle(self.render_more)
+        self.output.configure(yscrollcommand=on_output_scroll)
+
+        # What the output shows, tracked here rather than read back from the widget
         self.has_results = False
+        self.output_header = ""
+        self.output_sections = []
+        self.rendered = 0
 
         # ── Keyboard Shortcuts ──────────────────────────────────────────────
         self.root.bind('<Alt-s>', lambda e: self.perform_search())
@@ -333,6 +151,18 @@ class DictionaryApp:
         self.root.bind('<Alt-plus>', lambda e: self.adjust_fuzzy(5))
         self.root.bind('<Alt-minus>', lambda e: self.adjust_fuzzy(-5))
         self.entry.bind('<Return>', lambda e: self.perform_search())
+        self.entry.bind('<Down>', lambda e: self.focus_suggestions())
+        self.entry.bind('<Escape>', lambda e: self.hide_suggestions())
+        self.suggestions.bind('<Return>', lambda e: self.choose_suggestion())
+        self.suggestions.bind('<Double-Button-1>', lambda e: self.choose_suggestion())
+        self.suggestions.bind('<Escape>', lambda e: self.focus_search())
+        self.suggestions.bind('<Up>', self.suggestions_up)
+        self.root.bind('<Alt-r>', lambda e: self.perform_compounds())
+        self.root.bind('<Alt-R>', lambda e: self.perform_compounds())
+        self.root.bind('<Alt-f>', lambda e: self.toggle_definitions())
+        self.root.bind('<Alt-F>', lambda e: self.toggle_definitions())
+        self.root.bind('<Alt-m>', lambda e: self.render_more())
+        self.root.bind('<Alt-M>', lambda e: self.render_more())
 
         # NEW: Alt + P → Insert "nə" into search box
         self.root.bind('<Alt-p>', lambda e: self.insert_nə())
@@ -370,13 +200,17 @@ class DictionaryApp:
             "- Alt + D: Decompose Results (English → Eald-vacha only, after a successful search)\n"
             "- Alt + N: Switch to English → Eald-vacha\n"
             "- Alt + V: Switch to Eald-vacha → English\n"
+            "- Alt + F: Toggle searching the English definitions and notes by keyword\n"
             "- Alt + E: Focus/return to search bar\n"
             "- Alt + C: Copy Results to Clipboard\n"
             "- Alt + X: Close the program (with confirmation)\n"
             "- Alt + +: Increase fuzzy tolerance by 5%\n"
             "- Alt + -: Decrease fuzzy tolerance by 5%\n"
             "- Alt + P: Insert 'nə' prefix into search box\n"
+            "- Alt + M: Show more results (long result lists are shown a page at a time)\n"
+            "- Alt + R: List the words built from the Eald-vacha root in the search box\n"
             "- Enter (in search box): Perform Search\n"
+            "- Down (in search box): Pick from the suggestions shown while typing; Enter searches, Esc closes them\n"
             "- Alt + H: Show this Help window\n\n"
             "Please note that the Decompose Results feature only works for English → Eald-vacha searches.\n\n"
             "Developed by: Brant von Goble (Eald-vacha-abba)\n\n"
@@ -419,6 +253,68 @@ class DictionaryApp:
         self.direction.set(direction_value)
         self.entry.focus_set()
 
+    def toggle_definitions(self):
+        self.definitions_var.set(not self.definitions_var.get())
+        self.entry.focus_set()
+
+    # (Re)start the timer that updates the suggestions
+    def schedule_suggestions(self):
+        if self.suggest_job is not None:
+            self.root.after_cancel(self.suggest_job)
+        self.suggest_job = self.root.after(SUGGEST_DELAY_MS, self.update_suggestions)
+
+    # Suggest terms for the search box text. Not for wildcard patterns or
+    # definition searches, nor while a reload is changing the indexes.
+    def update_suggestions(self):
+        self.suggest_job = None
+        text = self.query_var.get()
+        if self.definitions_var.get() or '*' in text or not text.strip():
+            self.hide_suggestions()
+            return
+        if not self.reload_lock.acquire(blocking=False):
+            self.hide_suggestions()
+            return
+        try:
+            found = self.dictionary.suggest(text, self.direction.get())
+        finally:
+            self.reload_lock.release()
+        if not found or found == [text.lstrip().lower()]:
+            self.hide_suggestions()
+            return
+        self.suggestions.delete(0, tk.END)
+        self.suggestions.insert(tk.END, *found)
+        self.suggestions.config(height=len(found))
+        self.suggestions.place(in_=self.entry, relx=0, rely=1.0, relwidth=1.0)
+        self.suggestions.lift()
+
+    def hide_suggestions(self):
+        if self.suggest_job is not None:
+            self.root.after_cancel(self.suggest_job)
+            self.suggest_job = None
+        self.suggestions.place_forget()
+
+    def focus_suggestions(self):
+        if self.suggestions.winfo_ismapped():
+            self.suggestions.focus_set()
+            self.suggestions.selection_clear(0, tk.END)
+            self.suggestions.selection_set(0)
+            self.suggestions.activate(0)
+
+    # Up from the first suggestion goes back to the search box
+    def suggestions_up(self, event):
+        if self.suggestions.index(tk.ACTIVE) == 0:
+            self.focus_search()
+            return 'break'
+
+    def choose_suggestion(self):
+        selection = self.suggestions.curselection()
+        if not selection:
+            return
+        self.query_var.set(self.suggestions.get(selection[0]))
+        self.entry.icursor(tk.END)
+        self.entry.focus_set()
+        self.perform_search()
+
     def perform_decompose_safe(self):
         if not self.last_results or self.last_direction != 'English to Eald-vacha':
             messagebox.showinfo("Not Available",
@@ -426,48 +322,187 @@ class DictionaryApp:
             return
         self.perform_decompose()
 
+    def set_busy(self, busy, message):
+        self.status_label.config(text=message)
+        if busy:
+            self.progress.start(15)
+        else:
+            self.progress.stop()
+
+    # Reload the dictionary if its spreadsheet changed, once no query is running
+    def check_for_edits(self):
+        watcher = self.dictionary.watcher
+        if watcher is not None and not self.executor.busy and watcher.check():
+            self.executor.submit(lambda job: self.reload(), self.show_reloaded,
+                                 on_error=self.show_reload_error, message="Reloading dictionary…",
+                                 profile=False)
+        self.root.after(RELOAD_POLL_MS, self.check_for_edits)
+
+    def reload(self):
+        with self.reload_lock:
+            return self.dictionary.reload()
+
+    def show_reloaded(self, diff):
+        if diff:
+            self.status_label.config(
+                text=f"Dictionary reloaded: {len(diff.added)} rows added or edited, {len(diff.removed)} replaced or removed")
+
+    # Likely a half-saved file; the next check tries again
+    def show_reload_error(self, error):
+        self.status_label.config(text=f"Could not reload dictionary: {error}")
+
+    # Timing of the last query, e.g. "12.3 ms (search.fuzzy 11.9 ms, ...)"
+    def show_timing(self, job):
+        total = job.profile.timers.pop('total')[1]
+        details = job.profile.summary()
+        self.timing_label.config(text=f"{total * 1000:.1f} ms" + (f" ({details})" if details else ""))
+
+    def show_query_error(self, error):
+        messagebox.showerror("Error", f"Query failed: {error}")
+
     def perform_search(self):
+        self.hide_suggestions()
         query = self.entry.get().strip()
         if not query:
             messagebox.showwarning("Input Required", "Please enter something to search.")
             return
         self.last_query = query
         self.output.delete(1.0, tk.END)
-        dir_val = self.direction.get()
+        definitions = self.definitions_var.get()
+        # Definition matches read English to Eald-vacha, whatever the direction
+        dir_val = 'English to Eald-vacha' if definitions else self.direction.get()
         self.last_direction = dir_val
         min_score = int(self.fuzzy_var.get())
-        results = search_word_exact_wildcard(self.df, query, dir_val)
-        self.last_results = results
-        if not results:
-            fuzzy_results = search_fuzzy(self.df, query, dir_val, min_score=min_score)
-            self.last_results = fuzzy_results
-            if fuzzy_results:
-                self.output.insert(tk.END, f"No exact/wildcard match for '{query}'.\n\n"
-                                          f"Fuzzy matches (min similarity {min_score}%):\n\n")
-                self.output.insert(tk.END, "\n---\n".join(fuzzy_results) + "\n")
+        self.last_results = []
+        self.has_results = False
+        self.output_header = ""
+        self.output_sections = []
+        self.rendered = 0
+        self.copy_btn.config(state='disabled')
+        self.decomp_btn.config(state='disabled')
+        self.more_btn.config(state='disabled')
+        if definitions:
+            self.executor.submit(
+                lambda job: self.dictionary.fulltext_results(query),
+                lambda results: self.show_fulltext_results(query, results),
+                on_error=self.show_query_error,
+                message=f"Searching definitions for '{query}'…")
+            return
+        self.executor.submit(
+            lambda job: self.dictionary.search_results(query, dir_val, min_score, check=job.check),
+            lambda found: self.show_search_results(query, dir_val, min_score, *found),
+            on_error=self.show_query_error,
+            message=f"Searching for '{query}'…")
+
+    def show_search_results(self, query, dir_val, min_score, results, is_fuzzy):
+        header = ""
+        if is_fuzzy:
+            if results:
+                header = (f"No exact/wildcard match for '{query}'.\n\n"
+                          f"Fuzzy matches (min similarity {min_score}%):\n\n")
             else:
-                self.output.insert(tk.END, f"No matches found (exact, wildcard, or fuzzy ≥ {min_score}%).\n")
-        else:
-            self.output.insert(tk.END, "\n---\n".join(results) + "\n")
-        self.has_results = bool(self.output.get(1.0, tk.END).strip())
+                header = f"No matches found (exact, wildcard, or fuzzy ≥ {min_score}%).\n"
+        self.show_results(dir_val, results, header)
+
+    def show_fulltext_results(self, query, results):
+        header = "" if len(results) else f"No definitions or notes contain all of '{query}'.\n"
+        self.show_results('English to Eald-vacha', results, header)
+
+    def show_results(self, dir_val, results, header):
+        self.last_results = results
+        self.output_header = header
+        self.output.insert(tk.END, header)
+        self.output.mark_set('results_end', 'end-1c')
+        self.output.mark_gravity('results_end', 'left')
+        self.render_more()
+        self.has_results = bool(header or len(results))
         self.copy_btn.config(state='normal' if self.has_results else 'disabled')
         self.decomp_btn.config(state='normal' if self.has_results and dir_val == 'English to Eald-vacha' else 'disabled')
-        self.output.see(tk.END)
+        self.output.see('1.0')
+
+    # Append the next page of results (before any decompositions shown below them)
+    def render_more(self):
+        results = self.last_results
+        if self.rendered >= len(results):
+            return
+        page = results.format(self.rendered, self.rendered + PAGE_SIZE)
+        text = (RESULT_SEPARATOR if self.rendered else "") + RESULT_SEPARATOR.join(page)
+        self.rendered += len(page)
+        remaining = len(results) - self.rendered
+        if not remaining:
+            text += "\n"
+        pos = self.output.index('results_end')
+        self.output.insert(pos, text)
+        self.output.mark_set('results_end', f"{pos} + {len(text)} chars")
+        self.more_btn.config(state='normal' if remaining else 'disabled')
+        self.status_label.config(text=f"Showing {self.rendered} of {len(results)} results" if remaining else "")
+
+    # Full text of the output, including pages not rendered yet
+    def output_text(self):
+        body = RESULT_SEPARATOR.join(self.last_results.format()) + "\n" if self.last_results else ""
+        return (self.output_header + body + "".join(self.output_sections)).strip()
+
+    def perform_compounds(self):
+        root_word = self.entry.get().strip()
+        if not root_word:
+            messagebox.showwarning("Input Required", "Please enter an Eald-vacha root.")
+            return
+        self.output.delete(1.0, tk.END)
+        self.last_results = []
+        self.has_results = False
+        self.output_header = ""
+        self.output_sections = []
+        self.rendered = 0
+        self.copy_btn.config(state='disabled')
+        self.decomp_btn.config(state='disabled')
+        self.more_btn.config(state='disabled')
+        self.executor.submit(lambda job: self.dictionary.compounds(root_word),
+                             lambda compounds: self.show_compounds(root_word, compounds),
+                             on_error=self.show_query_error,
+                             message=f"Finding words built from '{root_word}'…")
+
+    def show_compounds(self, root_word, compounds):
+        if compounds:
+            lines = [f"Words built from '{root_word}' ({len(compounds)}), best match first:\n"]
+            lines += [f"{i}. {word} → {english} (score: {int(score)}%)"
+                      for i, (score, word, english) in enumerate(compounds, 1)]
+            text = "\n".join(lines) + "\n"
+        else:
+            text = f"No words found that are built from '{root_word}'.\n"
+        self.output_header = text
+        self.output.insert(tk.END, text)
+        self.has_results = True
+        self.copy_btn.config(state='normal')
+        self.output.see('1.0')
 
     def perform_decompose(self):
-        self.output.insert(tk.END, f"\n=== Decompositions ===\n\n")
-        for result in self.last_results:
-            lines = result.split('\n')
-            word_line = next((l for l in lines if l.startswith('Eald-vacha: ')), None)
-            if word_line:
-                word = word_line[len('Eald-vacha: '):].strip()
-                decomp = decompose_word(word, self.df, roots=self.roots)
-                self.output.insert(tk.END, f"Decomposition for {word}:\n{decomp}\n\n")
+        words = []
+        if self.last_direction == 'English to Eald-vacha':
+            words = [word.strip() for word in self.last_results.translations()]
+
+        def work(job):
+            decomps = []
+            for i, word in enumerate(words, 1):
+                job.check()
+                job.progress(f"Decomposing {word} ({i}/{len(words)})…")
+                decomps.append((word, self.dictionary.decompose(word)))
+            return decomps
+
+        self.executor.submit(work, self.show_decompositions,
+                             on_progress=lambda message: self.status_label.config(text=message),
+                             on_error=self.show_query_error,
+                             message="Decomposing…")
+
+    def show_decompositions(self, decomps):
+        text = f"\n=== Decompositions ===\n\n" + "".join(
+            f"Decomposition for {word}:\n{decomp}\n\n" for word, decomp in decomps)
+        self.output_sections.append(text)
+        self.output.insert(tk.END, text)
         self.output.see(tk.END)
 
     def copy_to_clipboard(self):
         if self.has_results:
-            text = self.output.get(1.0, tk.END).strip()
+            text = self.output_text()
             try:
                 pyperclip.copy(text)
                 messagebox.showinfo("Success", "Results copied to clipboard!")
@@ -0,0 +1,241 @@
+# Command-line front end: batch lookups and decompositions as JSON lines
+#
+#   python dictionary_cli.py search [FILE] [--direction en|ev] [--min-score N] [--jobs N]
+#   python dictionary_cli.py fulltext [FILE] [--limit N] [--jobs N]
+#   python dictionary_cli.py decompose [FILE] [--jobs N]
+#   python dictionary_cli.py compounds [FILE] [--jobs N]
+#   python dictionary_cli.py gloss [FILE] [--width N]
+#   python dictionary_cli.py build-decompositions [--jobs N]
+#   python dictionary_cli.py import-sqlite DATABASE [SPREADSHEET ...]
+#
+# Words (for fulltext, English keyword queries) are read one per line from
+# FILE (or stdin) as a stream, and one JSON object per word is written to
+# stdout in input order. With --jobs N the work is spread over N processes,
+# each loading the dictionary once; only a small window of batches is in
+# flight, so memory stays flat on unbounded input.
+# gloss instead reads running Eald-vacha text and writes it back glossed
+# interlinearly (see interlinear.py), line by line as it is read.
+# --profile writes per-stage timings and counters as JSON to stderr at the end.
+# --dictionary may also name a lexicon database made by import-sqlite (see
+# sqlite_backend.py).
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import instrument
+from interlinear import interlinear
+from dictionary_core import EN_TO_EV, EV_TO_EN, build_and_save_decomposition_index, load_snapshot, open_dictionary
+from sqlite_backend import import_lexicon, is_database
+
+DIRECTIONS = {'en': EN_TO_EV, 'ev': EV_TO_EN}
+BATCH_SIZE = 64
+GLOSS_CACHE_SIZE = 65536
+
+# The dictionary of this process, loaded once by _init_worker(), and the
+# recorder its work is profiled into (None when not profiling)
+_dictionary = None
+_profile = None
+
+
+def _init_worker(file_path, profile=False):
+    global _dictionary, _profile
+    _profile = instrument.Recorder() if profile else None
+    if _profile is None:
+        _dictionary = open_dictionary(file_path)
+        return
+    with instrument.recording(_profile):
+        _dictionary = open_dictionary(file_path)
+
+
+def search_record(dictionary, word, direction=EN_TO_EV, min_score=75):
+    results, is_fuzzy = dictionary.search(word, direction, min_score)
+    match = None if not results else 'fuzzy' if is_fuzzy else 'exact'
+    return {'query': word, 'direction': direction, 'match': match, 'results': results}
+
+
+def fulltext_record(dictionary, query, limit=None):
+    results = dictionary.fulltext_results(query)
+    return {'query': query, 'total': len(results), 'results': results.format(0, limit)}
+
+
+def decompose_record(dictionary, word):
+    return {'word': word, 'decomposition': dictionary.decompose(word)}
+
+
+def compounds_record(dictionary, root):
+    return {'root': root, 'compounds': [{'word': word, 'english': english, 'score': round(score, 2)}
+                                        for score, word, english in dictionary.compounds(root)]}
+
+
+COMMANDS = {'search': search_record, 'fulltext': fulltext_record, 'decompose': decompose_record,
+            'compounds': compounds_record}
+
+
+# JSON lines for a batch, and the profile of the work so far in this process
+def _run_batch(command, options, words):
+    handler = COMMANDS[command]
+    if _profile is None:
+        return [json.dumps(handler(_dictionary, word, **options), ensure_ascii=False) for word in words], None
+    lines = []
+    with instrument.recording(_profile):
+        for word in words:
+            with instrument.stage(f'cli.{command}'):
+                lines.append(json.dumps(handler(_dictionary, word, **options), ensure_ascii=False))
+    return lines, _profile.take()
+
+
+def _lines(batch, profile):
+    lines, report = batch
+    if report is not None:
+        profile.merge(report)
+    return lines
+
+
+def read_words(stream):
+    for line in stream:
+        word = line.strip()
+        if word:
+            yield word
+
+
+def _batches(words, size=BATCH_SIZE):
+    batch = []
+    for word in words:
+        batch.append(word)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# JSON lines for `words`, in order. With a `profile` recorder, the timings
+# and counts of every process are merged into it.
+def run(command, options, words, file_path='dictionary.xlsx', jobs=1, profile=None):
+    # Compile the snapshot once up front so workers only ever read it
+    if not is_database(file_path):
+        load_snapshot(file_path)
+    if jobs <= 1:
+        _init_worker(file_path, profile is not None)
+        for batch in _batches(words):
+            yield from _lines(_run_batch(command, options, batch), profile)
+        return
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(file_path, profile is not None)) as pool:
+        pending = deque()
+        for batch in _batches(words):
+            pending.append(pool.submit(_run_batch, command, options, batch))
+            if len(pending) >= 2 * jobs:
+                yield from _lines(pending.popleft().result(), profile)
+        while pending:
+            yield from _lines(pending.popleft().result(), profile)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Eald-vacha dictionary batch tools (JSON lines output).")
+    parser.add_argument('--dictionary', default='dictionary.xlsx', help="dictionary spreadsheet or lexicon database (default: %(default)s)")
+    parser.add_argument('--profile', action='store_true', help="report stage timings and counters as JSON on stderr")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    search = commands.add_parser('search', help="exact/wildcard search with fuzzy fallback")
+    search.add_argument('--direction', choices=sorted(DIRECTIONS), default='en',
+                        help="en: English to Eald-vacha, ev: Eald-vacha to English (default: %(default)s)")
+    search.add_argument('--min-score', type=int, default=75, help="fuzzy match tolerance (default: %(default)s)")
+
+    fulltext = commands.add_parser('fulltext', help="ranked keyword search over English definitions and notes")
+    fulltext.add_argument('--limit', type=int, help="best N results per query (default: all)")
+
+    decompose = commands.add_parser('decompose', help="morphological decomposition of Eald-vacha words")
+    compounds = commands.add_parser('compounds', help="words built from each root, best match first")
+
+    gloss = commands.add_parser('gloss', help="interlinear gloss of Eald-vacha text")
+    gloss.add_argument('input', nargs='?', help="text file (default: stdin)")
+    gloss.add_argument('--width', type=int, default=78, help="wrap the glossed tiers at this width (default: %(default)s)")
+    gloss.add_argument('--cache-size', type=int, default=GLOSS_CACHE_SIZE,
+                       help="distinct words whose glosses are kept (default: %(default)s)")
+
+    build = commands.add_parser('build-decompositions',
+                                help="precompute every entry's decomposition and the root-to-compounds index")
+    build.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                       help="worker processes (default: number of CPUs)")
+
+    import_sqlite = commands.add_parser('import-sqlite', help="merge spreadsheets into a lexicon database")
+    import_sqlite.add_argument('database', help="database to write, e.g. lexicon.sqlite")
+    import_sqlite.add_argument('spreadsheets', nargs='*',
+                               help="spreadsheets to merge, in order (default: --dictionary)")
+
+    for command in (search, fulltext, decompose, compounds):
+        command.add_argument('input', nargs='?', help="one word per line (default: stdin)")
+        command.add_argument('--jobs', type=int, default=1, help="worker processes (default: %(default)s)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.profile:
+        return _main(args)
+    profile = instrument.Recorder()
+    start = time.perf_counter()
+    with instrument.recording(profile):
+        status = _main(args, profile)
+    report = {'command': args.command, 'jobs': getattr(args, 'jobs', 1),
+              'wall_ms': round((time.perf_counter() - start) * 1000, 3), **profile.report()}
+    print(json.dumps(report, indent=2), file=sys.stderr)
+    return status
+
+
+def _main(args, profile=None):
+    if args.command == 'build-decompositions':
+        index = build_and_save_decomposition_index(args.dictionary, args.jobs)
+        print(f"Decomposed {len(index.decompositions)} entries; "
+              f"{len(index.compounds_by_root)} roots indexed.", file=sys.stderr)
+        return 0
+    if args.command == 'import-sqlite':
+        count = import_lexicon(args.database, args.spreadsheets or [args.dictionary])
+        print(f"Imported {count} entries into {args.database}.", file=sys.stderr)
+        return 0
+    if args.command == 'gloss':
+        return _gloss(args)
+    options = {}
+    if args.command == 'search':
+        options = {'direction': DIRECTIONS[args.direction], 'min_score': args.min_score}
+    elif args.command == 'fulltext':
+        options = {'limit': args.limit}
+
+    stream = open(args.input, encoding='utf-8') if args.input else sys.stdin
+    with stream:
+        out = sys.stdout
+        try:
+            lines = run(args.command, options, read_words(stream), args.dictionary, args.jobs, profile)
+            for i, line in enumerate(lines, 1):
+                out.write(line + '\n')
+                if i % BATCH_SIZE == 0:
+                    out.flush()
+            out.flush()
+        except BrokenPipeError:
+            # Downstream closed early (e.g. `| head`); silence the flush at exit
+            sys.stdout = None
+    return 0
+
+
+def _gloss(args):
+    dictionary = open_dictionary(args.dictionary, cache_size=args.cache_size)
+    stream = open(args.input, encoding='utf-8') if args.input else sys.stdin
+    with stream:
+        out = sys.stdout
+        try:
+            for line in interlinear(stream, dictionary.gloss, args.width):
+                out.write(line + '\n')
+                if not line:
+                    out.flush()
+            out.flush()
+        except BrokenPipeError:
+            sys.stdout = None
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
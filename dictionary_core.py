@@ -0,0 +1,874 @@
+# Dictionary lookup, search and decomposition, without any GUI.
+# dictionary.py (Tk) and dictionary_cli.py are thin front ends over this module.
+import difflib
+import sys
+import os
+import instrument
+from entry_store import COLUMNS, EntryStore, alternate_parts, cell_alternates, normalize
+from snapshot import Snapshot, read_snapshot, write_snapshot, snapshot_path
+from wildcard import WildcardIndex
+from fuzzy import FuzzyIndex
+from fulltext import FullTextIndex
+from autocomplete import Completer
+from segmentation import MAX_CANDIDATES, RootTrie, SegmentationDAG, best_segmentations
+from decomposition_index import (DecompositionIndex, decomposition_index_path,
+                                 read_decomposition_index, write_decomposition_index)
+from query_cache import DEFAULT_CACHE_SIZE, QueryCache
+from hot_reload import FileWatcher, diff_entries
+from concurrent.futures import ProcessPoolExecutor
+from bisect import insort
+
+EN_TO_EV = 'English to Eald-vacha'
+EV_TO_EN = 'Eald-vacha to English'
+# get_meaning() of a term that is in no entry
+UNKNOWN = "[unknown]"
+
+# Helper for PyInstaller / dev paths
+def resource_path(relative_path):
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+# Cell texts read as empty, as pandas.read_excel (which this used to call) does
+NA_STRINGS = frozenset(['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+                        '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'])
+
+def _cell_text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value)
+    return None if value in NA_STRINGS else value
+
+# Read the first sheet of the spreadsheet into plain (English, Eald-vacha,
+# Notes) rows. openpyxl is only needed here, to compile a new snapshot.
+def read_entries(file_path):
+    from openpyxl import load_workbook
+    book = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = list(book.worksheets[0].iter_rows(values_only=True))
+    finally:
+        book.close()
+    # Trailing blank rows are formatting, not entries
+    while rows and all(v is None or v == '' for v in rows[-1]):
+        rows.pop()
+    if not rows:
+        return []
+    header = rows[0]
+    columns = range(3) if len(header) == 3 else [header.index(name) for name in COLUMNS]
+    return [tuple(_cell_text(row[i]) if i < len(row) else None for i in columns) for row in rows[1:]]
+
+# Load the compiled snapshot, rebuilding it from the spreadsheet when stale
+def load_snapshot(file_path='dictionary.xlsx'):
+    file_path = resource_path(file_path)
+    snap_path = snapshot_path(file_path)
+    with instrument.stage('load.snapshot'):
+        snap = read_snapshot(snap_path, file_path)
+    if snap is not None:
+        return snap
+    with instrument.stage('load.read_excel'):
+        entries = read_entries(file_path)
+    store = EntryStore(entries)
+    with instrument.stage('load.build_roots'):
+        roots = build_roots(store)
+    with instrument.stage('load.build_term_index'):
+        tables = build_term_index(store).tables()
+    snap = Snapshot(entries, roots, tables)
+    try:
+        with instrument.stage('load.write_snapshot'):
+            write_snapshot(snap_path, file_path, snap.entries, snap.roots, snap.tables)
+    except OSError:
+        pass  # read-only install (e.g. PyInstaller bundle): just skip caching
+    return snap
+
+# Load dictionary
+def load_dictionary(file_path='dictionary.xlsx'):
+    return EntryStore(load_snapshot(file_path).entries)
+
+# Roots of one Eald-vacha cell: its '/'-alternates and their '-'-parts,
+# stripped and lowercased
+def cell_roots(cell):
+    # A blank cell has always counted as the root 'nan' (str() of a
+    # pandas NaN); kept so decompositions don't change
+    roots = set()
+    for alt in (cell if cell is not None else 'nan').split('/'):
+        alt = alt.strip().lower()
+        roots.update(p.strip().lower() for p in alt.split('-') if p.strip())
+        roots.add(alt)
+    return roots
+
+# {root: number of entries using it}, how often a root is used as a word
+# or in compounds
+def root_usage(store):
+    terms = store.terms('Eald-vacha')
+    usage = {}
+    for row, cell in enumerate(store['Eald-vacha']):
+        if cell is None:
+            roots = cell_roots(cell)
+        else:
+            # As cell_roots(), from the store's split terms
+            roots = {root for alt in terms.row(row)[1] for root in (alt, *terms.parts(alt))}
+        for root in roots:
+            usage[root] = usage.get(root, 0) + 1
+    return usage
+
+# Pre-build all possible root terms
+def build_roots(store):
+    terms = store.terms('Eald-vacha')
+    roots = set(terms.normalized)
+    for alt in list(roots):
+        roots.update(terms.parts(alt))
+    if None in store['Eald-vacha']:
+        roots.update(cell_roots(None))
+    return roots
+
+# Row index of every Eald-vacha form, in dictionary order:
+#   exact       the whole cell, lowercased
+#   alternates  each '/'-alternate, stripped and lowercased
+#   parts       each '-'-part of an alternate, stripped and lowercased
+class TermIndex:
+    __slots__ = ('exact', 'alternates', 'parts')
+
+    def __init__(self, exact, alternates, parts):
+        self.exact = exact
+        self.alternates = alternates
+        self.parts = parts
+
+    @classmethod
+    def from_tables(cls, tables):
+        return cls(tables['eald'], tables['alt'], tables['part'])
+
+    def tables(self):
+        return {'eald': self.exact, 'alt': self.alternates, 'part': self.parts}
+
+    # First row whose whole cell equals term_lower
+    def find_exact(self, term_lower):
+        rows = self.exact.get(term_lower)
+        return rows[0] if rows else None
+
+    # First row listing term_lower as an alternate
+    def find_alternate(self, term_lower):
+        rows = self.alternates.get(term_lower)
+        return rows[0] if rows else None
+
+    # First row listing term_lower as an alternate or as part of one
+    def find_term(self, term_lower):
+        found = [rows[0] for rows in (self.alternates.get(term_lower), self.parts.get(term_lower)) if rows]
+        return min(found) if found else None
+
+    # (table, key) pairs an Eald-vacha cell is indexed under; a part shared
+    # by two alternates comes up (and is listed in the table) twice. The
+    # cell's normalized alternates and parts are split again unless given.
+    def keys(self, entry, alternates=None, parts=alternate_parts):
+        yield self.exact, normalize(entry)
+        if alternates is None:
+            alternates = map(normalize, cell_alternates(entry))
+        for alt in set(alternates):
+            yield self.alternates, alt
+            for p in set(parts(alt)):
+                yield self.parts, p
+
+    # Apply a reload (see Dictionary._update_indexes); returns the keys whose
+    # rows changed
+    def update(self, removed, added, row_map=None):
+        touched = set()
+        for row, entry in removed:
+            if entry is None:
+                continue
+            for table, key in self.keys(entry):
+                rows = table[key]
+                rows.remove(row)
+                if not rows:
+                    del table[key]
+                touched.add(key)
+        if row_map is not None:
+            for table in (self.exact, self.alternates, self.parts):
+                for key, rows in table.items():
+                    table[key] = [row_map[r] for r in rows]
+        for row, entry in added:
+            if entry is None:
+                continue
+            for table, key in self.keys(entry):
+                insort(table.setdefault(key, []), row)
+                touched.add(key)
+        return touched
+
+def build_term_index(store):
+    index = TermIndex({}, {}, {})
+    terms = store.terms('Eald-vacha')
+    for i, entry in enumerate(store['Eald-vacha']):
+        if entry is None:
+            continue
+        for table, key in index.keys(entry, terms.row(i)[1], terms.parts):
+            table.setdefault(key, []).append(i)
+    return index
+
+def _entry_notes(store, row):
+    notes = store['Notes'][row]
+    return f" ({notes})" if notes is not None else ""
+
+# Get meaning for a term
+def get_meaning(term, store, index=None):
+    if index is None:
+        index = build_term_index(store)
+    term_lower = term.lower()
+    row = index.find_exact(term_lower)
+    if row is None:
+        row = index.find_term(term_lower)
+    if row is None:
+        return UNKNOWN
+    return store['English'][row]
+
+# Find all segmentations
+def find_segmentations(word_lower, roots):
+    segmentations = list(SegmentationDAG(word_lower, roots).segmentations())
+    instrument.count('segmentation.found', len(segmentations))
+    return segmentations
+
+# Score a segmentation
+def score_segmentation(seg, word_lower, store, actual_eng, index=None):
+    num_parts = len(seg)
+    coverage = sum(end - start for start, end, _ in seg) / len(word_lower)
+    if coverage < 0.9:
+        return 0
+    composed = " ".join(get_meaning(p, store, index) for _, _, p in seg).lower()
+    sim = difflib.SequenceMatcher(None, composed, actual_eng.lower()).ratio()
+    score = (sim * 80) + (num_parts * 10) + (coverage * 10)
+    return score
+
+# Top-k (score, parts_str) decompositions scoring above 25, best first, and
+# whether the search hit the candidate cap; None if the word has no
+# segmentation at all
+def rank_decompositions(word, store, roots, index=None, k=3, max_candidates=MAX_CANDIDATES):
+    if index is None:
+        index = build_term_index(store)
+    word_lower = word.lower()
+    row = index.find_exact(word_lower)
+    actual_eng = store['English'][row] if row is not None else ""
+    dag = SegmentationDAG(word_lower, roots)
+    if dag.max_parts[0] < 2:
+        return None, False
+    meanings = {}
+
+    def meaning(p):
+        if p not in meanings:
+            meanings[p] = get_meaning(p, store, index)
+        return meanings[p]
+
+    scored = 0
+
+    def key(seg):
+        nonlocal scored
+        scored += 1
+        score = score_segmentation(seg, word_lower, store, actual_eng, index)
+        return score, " + ".join(f"{p}: {meaning(p)}" for _, _, p in seg)
+
+    # Completions cover the whole word (coverage 1.0); the composed meaning
+    # only grows, which caps the similarity once it outgrows the definition
+    eng_len = len(actual_eng.lower())
+
+    def upper_bound(path, max_more):
+        composed_len = sum(len(meaning(p).lower()) + 1 for _, _, p in path)
+        sim = 1.0 if composed_len < eng_len else 2 * eng_len / (composed_len + eng_len)
+        return sim * 80 + (len(path) + max_more) * 10 + 10 + 1e-9
+
+    with instrument.stage('decompose.rank'):
+        ranked, truncated = best_segmentations(dag, key, upper_bound, k=k, floor=25, max_candidates=max_candidates)
+    instrument.count('segmentation.scored', scored)
+    if truncated:
+        instrument.count('segmentation.truncated')
+    return ranked, truncated
+
+# Possible decompositions
+def find_possible_decompositions(word, store, roots, index=None):
+    ranked, truncated = rank_decompositions(word, store, roots, index)
+    if ranked is None:
+        return "No possible decompositions found."
+    if not ranked:
+        return "No high-confidence decompositions."
+    output = ""
+    for i, (score, decomp, _) in enumerate(ranked, 1):
+        output += f"{i}. (score: {int(score)}%) {decomp}\n"
+    if truncated:
+        output += f"(search stopped after {MAX_CANDIDATES} candidate segmentations; results may be incomplete)\n"
+    return output
+
+# Decomposition
+def decompose_word(word, store, indent=0, visited=None, roots=None, index=None):
+    if visited is None:
+        visited = set()
+    if roots is None:
+        roots = build_roots(store)
+    if index is None:
+        index = build_term_index(store)
+    word_lower = word.lower()
+    if word_lower in visited:
+        return f"{'  ' * indent}{word}: [cycle detected]"
+    visited.add(word_lower)
+    indent_str = '  ' * indent
+    output = []
+    if '-' in word:
+        parts = [p.strip() for p in word.split('-')]
+        decomp_parts = []
+        for p in parts:
+            sub = decompose_word(p, store, indent + 1, visited.copy(), roots, index)
+            decomp_parts.append(sub)
+        row = index.find_exact(word_lower)
+        meaning = ""
+        if row is not None:
+            meaning = f" → {store['English'][row]}{_entry_notes(store, row)}"
+        output.append(f"{indent_str}{word} (compound){meaning}:\n" + '\n'.join(decomp_parts))
+        return '\n'.join(output)
+    if '/' in word:
+        parts = [p.strip() for p in word.split('/')]
+        decomp_parts = [decompose_word(p, store, indent, visited.copy(), roots, index) for p in parts]
+        return '\n'.join(decomp_parts)
+    if word_lower.startswith('nə'):
+        base = word[2:].strip()
+        if base:
+            sub = decompose_word(base, store, indent + 1, visited.copy(), roots, index)
+            output.append(f"{indent_str}{word} (negation prefix):\n{indent_str}  nə: not / negation / without\n{sub}")
+            return '\n'.join(output)
+    atomic_meaning = ""
+    row = index.find_exact(word_lower)
+    if row is None:
+        row = index.find_alternate(word_lower)
+    if row is not None:
+        atomic_meaning = f"{indent_str}{word}: {store['English'][row]}{_entry_notes(store, row)}"
+    if atomic_meaning:
+        output.append(atomic_meaning)
+    else:
+        output.append(f"{indent_str}{word}: [not found]")
+    if len(word) > 6 and '-' not in word and '/' not in word and not word_lower.startswith('nə'):
+        possible = find_possible_decompositions(word, store, roots, index)
+        if possible and "No" not in possible:
+            output.append(f"{indent_str}Possible compound word roots:\n{possible}")
+    return '\n'.join(output)
+
+# Short gloss label for an English definition: its first alternate,
+# lowercased, with spaces as dots ("Now/At Present" -> "now")
+def gloss_label(english):
+    if english is None or english == UNKNOWN:
+        return "?"
+    label = english.split('/')[0].strip().lower()
+    return '.'.join(label.split()) or "?"
+
+# Interlinear gloss of one word, as (morphemes, glosses): the word split
+# into morphemes joined by '-', and their labels joined the same way.
+# Tried in turn: the word as an entry, its '-'-parts, a 'nə' negation
+# prefix, and the best segmentation into roots; '?' when all fail.
+def gloss_word(word, store, roots, index):
+    word_lower = word.lower()
+    row = index.find_exact(word_lower)
+    if row is None:
+        row = index.find_alternate(word_lower)
+    if row is not None:
+        return word, gloss_label(store['English'][row])
+    if '-' in word:
+        parts = [gloss_word(p, store, roots, index) for p in word.split('-') if p]
+        return '-'.join(m for m, _ in parts), '-'.join(g for _, g in parts)
+    if word_lower.startswith('nə') and word[2:]:
+        morphemes, glosses = gloss_word(word[2:], store, roots, index)
+        return f"{word[:2]}-{morphemes}", f"NEG-{glosses}"
+    ranked, _ = rank_decompositions(word, store, roots, index, k=1)
+    if ranked:
+        _, _, seg = ranked[0]
+        # Slice the original spelling unless lowercasing changed its length
+        source = word if len(word) == len(word_lower) else word_lower
+        return ('-'.join(source[start:end] for start, end, _ in seg),
+                '-'.join(gloss_label(get_meaning(p, store, index)) for _, _, p in seg))
+    return word, "?"
+
+# Wildcard indexes for both searchable columns
+def build_wildcard_index(store, columns=('English', 'Eald-vacha')):
+    return {col: WildcardIndex(store[col], store.terms(col))
+            for col in columns}
+
+# Suggestion completers for both searchable columns: Eald-vacha terms are
+# weighted by root usage, English terms by how many entries they are in
+def build_completers(wildcard, usage):
+    return {'English': Completer(wildcard['English']),
+            'Eald-vacha': Completer(wildcard['Eald-vacha'], usage)}
+
+def search_columns(direction):
+    if direction == EN_TO_EV:
+        return 'English', 'Eald-vacha'
+    return 'Eald-vacha', 'English'
+
+# Search results as dictionary rows, formatted only when a slice is asked for
+class ResultSet:
+    def __init__(self, store, direction, items, rows, format_items):
+        self.store = store
+        self.direction = direction
+        self.items = items
+        self.rows = rows
+        self.format_items = format_items
+
+    def __len__(self):
+        return len(self.items)
+
+    def format(self, start=0, stop=None):
+        with instrument.stage('search.format'):
+            return self.format_items(self.items[start:stop])
+
+    # Result-column cells of the matched rows (the Eald-vacha words when
+    # searching from English)
+    def translations(self):
+        _, result_col = search_columns(self.direction)
+        column = self.store[result_col]
+        return [column[row] for row in self.rows if column[row] is not None]
+
+# Rows matching an exact or wildcard query, in dictionary order
+def match_exact_wildcard(store, query, direction, wildcard=None):
+    q = query.strip().lower()
+    search_col, _ = search_columns(direction)
+    if wildcard is None:
+        wildcard = build_wildcard_index(store, (search_col,))
+    engine = wildcard[search_col]
+    starts_star = q.startswith('*')
+    ends_star = q.endswith('*')
+    if starts_star and ends_star:
+        match_str = q[1:-1].strip()
+        match_func = engine.infix
+    elif starts_star:
+        match_str = q[1:].strip()
+        match_func = engine.suffix
+    elif ends_star:
+        match_str = q[:-1].strip()
+        match_func = engine.prefix
+    else:
+        match_str = q.strip()
+        match_func = engine.exact
+    exclude_terms = ["habban", "amabba"]
+    trigger = "abba"
+    is_wildcard = starts_star or ends_star
+    trigger_in_pattern = trigger in match_str
+    pattern_has_excluded_term = any(excl in match_str for excl in exclude_terms)
+    apply_exclusion = is_wildcard and trigger_in_pattern and not pattern_has_excluded_term
+    term_ids = match_func(match_str)
+    instrument.count('wildcard.terms', len(term_ids))
+    return engine.rows(term_ids, exclude_terms if apply_exclusion else ())
+
+def format_exact_matches(store, query, direction, rows):
+    original_query = query.strip()
+    search_col, result_col = search_columns(direction)
+    results = []
+    entries, translations, all_notes = store[search_col], store[result_col], store['Notes']
+    for row in rows:
+        entry, trans, notes = entries[row], translations[row], all_notes[row]
+        notes = notes if notes is not None else "No notes available."
+        results.append(
+            f"Match found for '{original_query}' in '{entry}':\n"
+            f"{result_col}: {trans}\n"
+            f"Notes: {notes}\n"
+        )
+    return results
+
+def exact_wildcard_results(store, query, direction, wildcard=None):
+    rows = match_exact_wildcard(store, query, direction, wildcard)
+    return ResultSet(store, direction, rows, rows,
+                     lambda rows: format_exact_matches(store, query, direction, rows))
+
+# Search functions
+def search_word_exact_wildcard(store, query, direction, wildcard=None):
+    return exact_wildcard_results(store, query, direction, wildcard).format()
+
+# Fuzzy indexes for both searchable columns
+def build_fuzzy_index(store, columns=('English', 'Eald-vacha')):
+    return {col: FuzzyIndex(store[col], store.terms(col))
+            for col in columns}
+
+# Best (score, row, term) fuzzy matches
+def match_fuzzy(store, query, direction, min_score=75, limit=4, fuzzy=None):
+    q_clean = query.strip().lower()
+    if not q_clean:
+        return []
+    search_col, _ = search_columns(direction)
+    if fuzzy is None:
+        fuzzy = build_fuzzy_index(store, (search_col,))
+    return fuzzy[search_col].search(q_clean, min_score, limit)
+
+def format_fuzzy_matches(store, direction, matches):
+    search_col, result_col = search_columns(direction)
+    results = []
+    for score, row, term in matches:
+        notes = store['Notes'][row]
+        notes = notes if notes is not None else "No notes available."
+        results.append(
+            f"**Fuzzy match** (score: {int(score)}%): '{term}' in '{store[search_col][row]}'\n"
+            f"{result_col}: {store[result_col][row]}\n"
+            f"Notes: {notes}\n"
+        )
+    return results
+
+def fuzzy_results(store, query, direction, min_score=75, limit=4, fuzzy=None):
+    matches = match_fuzzy(store, query, direction, min_score, limit, fuzzy)
+    return ResultSet(store, direction, matches, [row for _, row, _ in matches],
+                     lambda matches: format_fuzzy_matches(store, direction, matches))
+
+def search_fuzzy(store, query, direction, min_score=75, limit=4, fuzzy=None):
+    return fuzzy_results(store, query, direction, min_score, limit, fuzzy).format()
+
+def build_fulltext_index(store):
+    return FullTextIndex(store['English'], store['Notes'])
+
+# Rows whose definition or notes contain every keyword of the query, as
+# (score, row) best first
+def match_fulltext(store, query, limit=None, fulltext=None):
+    if fulltext is None:
+        fulltext = build_fulltext_index(store)
+    return fulltext.search(query, limit)
+
+def format_fulltext_matches(store, matches):
+    results = []
+    for score, row in matches:
+        notes = store['Notes'][row]
+        notes = notes if notes is not None else "No notes available."
+        results.append(
+            f"**Definition match** (score: {score:.1f}): '{store['English'][row]}'\n"
+            f"Eald-vacha: {store['Eald-vacha'][row]}\n"
+            f"Notes: {notes}\n"
+        )
+    return results
+
+# English keyword search; results read English to Eald-vacha
+def fulltext_results(store, query, limit=None, fulltext=None):
+    matches = match_fulltext(store, query, limit, fulltext)
+    return ResultSet(store, EN_TO_EV, matches, [row for _, row in matches],
+                     lambda matches: format_fulltext_matches(store, matches))
+
+def search_fulltext(store, query, limit=None, fulltext=None):
+    return fulltext_results(store, query, limit, fulltext).format()
+
+
+# Dictionary plus every derived index, loaded once and shared by all queries.
+# Search and decomposition results are kept in an LRU cache. With a source
+# spreadsheet, reload() picks up edits to it: the indexes are updated for
+# the changed rows only, and only cached results touching them are dropped.
+class Dictionary:
+    def __init__(self, snap, decompositions=None, source=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.entries = snap.entries
+        with instrument.stage('index.store'):
+            self.store = EntryStore(snap.entries)
+        with instrument.stage('index.roots'):
+            self.roots = RootTrie(snap.roots)
+        self.index = TermIndex.from_tables(snap.tables)
+        with instrument.stage('index.wildcard'):
+            self.wildcard = build_wildcard_index(self.store)
+        with instrument.stage('index.fuzzy'):
+            self.fuzzy = build_fuzzy_index(self.store)
+        with instrument.stage('index.fulltext'):
+            self.fulltext = build_fulltext_index(self.store)
+        with instrument.stage('index.suggest'):
+            self.usage = root_usage(self.store)
+            self.completers = build_completers(self.wildcard, self.usage)
+        self.decompositions = decompositions
+        # Entries whose precomputed analysis went stale in a reload, as
+        # {word: English}; re-analysed the next time compounds() is asked
+        self.pending = {}
+        self.cache = QueryCache(cache_size)
+        self.source = source
+        self.watcher = FileWatcher(source) if source else None
+
+    # Load the dictionary, with its precomputed decompositions when they
+    # have been built for this spreadsheet
+    @classmethod
+    def load(cls, file_path='dictionary.xlsx', decompositions=True, cache_size=DEFAULT_CACHE_SIZE):
+        with instrument.stage('load'):
+            snap = load_snapshot(file_path)
+            source = resource_path(file_path)
+            index = None
+            if decompositions:
+                with instrument.stage('load.decompositions'):
+                    index = read_decomposition_index(decomposition_index_path(source), source)
+            return cls(snap, index, source, cache_size)
+
+    # Exact/wildcard search, falling back to fuzzy search when nothing
+    # matches; returns (ResultSet, is_fuzzy). check(), if given, is called
+    # between the two stages and may raise to abandon the search.
+    def search_results(self, query, direction, min_score=75, check=None):
+        def search():
+            with instrument.stage('search.exact'):
+                results = exact_wildcard_results(self.store, query, direction, self.wildcard)
+            if len(results):
+                return results, False
+            if check is not None:
+                check()
+            with instrument.stage('search.fuzzy'):
+                return fuzzy_results(self.store, query, direction, min_score=min_score, fuzzy=self.fuzzy), True
+        return self._cached(('search', query.strip(), direction, min_score), search)
+
+    # As search_results(), with every result formatted
+    def search(self, query, direction, min_score=75, check=None):
+        results, is_fuzzy = self.search_results(query, direction, min_score, check)
+        return results.format(), is_fuzzy
+
+    # Ranked keyword search over the English definitions and notes, as a
+    # ResultSet reading English to Eald-vacha
+    def fulltext_results(self, query):
+        def search():
+            with instrument.stage('search.fulltext'):
+                return fulltext_results(self.store, query, fulltext=self.fulltext)
+        return self._cached(('fulltext', query.strip()), search)
+
+    # Search-as-you-type suggestions: terms of the searched column starting
+    # with `prefix`, most used first
+    def suggest(self, prefix, direction):
+        with instrument.stage('suggest'):
+            return self.completers[search_columns(direction)[0]].suggest(prefix)
+
+    def meaning(self, term):
+        return get_meaning(term, self.store, self.index)
+
+    def decompose(self, word):
+        if self.decompositions is not None:
+            cached = self.decompositions.decomposition(word)
+            if cached is not None:
+                instrument.count('decompose.precomputed')
+                return cached
+        def decompose():
+            with instrument.stage('decompose'):
+                return decompose_word(word, self.store, roots=self.roots, index=self.index)
+        return self._cached(('decompose', word), decompose)
+
+    # (morphemes, glosses) of a word in running text, cached per distinct word
+    def gloss(self, word):
+        def gloss():
+            with instrument.stage('gloss'):
+                return gloss_word(word, self.store, self.roots, self.index)
+        return self._cached(('gloss', word), gloss)
+
+    # The cached result for `key`, or compute()'s, cached, on a miss
+    def _cached(self, key, compute):
+        cached = self.cache.get(key)
+        if cached is not None:
+            instrument.count('cache.hits')
+            return cached
+        instrument.count('cache.misses')
+        cached = compute()
+        self.cache.put(key, cached)
+        return cached
+
+    # Words built from `root`, as (score, word, English) best first; builds
+    # the decomposition index in-process if it was not loaded
+    def compounds(self, root):
+        if self.decompositions is None:
+            with instrument.stage('compounds.build_index'):
+                self.decompositions = build_decomposition_index(self)
+        elif self.pending:
+            pending, self.pending = self.pending, {}
+            with instrument.stage('compounds.reanalyse'):
+                self.decompositions.add([analyse_entry(self, word, english) for word, english in pending.items()])
+        return self.decompositions.compounds(root)
+
+    # (entries, stamp) of the spreadsheet if it changed on disk since it was
+    # last loaded, else None. Only reads the file, so it can run alongside
+    # queries; hand the result to apply_entries().
+    def read_changes(self):
+        if self.watcher is None:
+            return None
+        stamp = self.watcher.check()
+        if stamp is None:
+            return None
+        with instrument.stage('reload.read_excel'):
+            return read_entries(self.source), stamp
+
+    # Switch to a new version of the entries, updating every index for the
+    # changed rows only. Not safe to run while queries are in flight.
+    # Returns the applied EntryDiff.
+    def apply_entries(self, entries, stamp=None):
+        with instrument.stage('reload.diff'):
+            diff = diff_entries(self.entries, entries)
+        instrument.count('reload.rows_removed', len(diff.removed))
+        instrument.count('reload.rows_added', len(diff.added))
+        with instrument.stage('reload.index'):
+            changed, keys = self._update_indexes(entries, diff)
+        with instrument.stage('reload.invalidate'):
+            self._invalidate(diff, changed, keys)
+        if stamp is not None:
+            self.watcher.seen = stamp
+        if self.source:
+            try:
+                with instrument.stage('reload.write_snapshot'):
+                    write_snapshot(snapshot_path(self.source), self.source, entries, set(self.roots), self.index.tables())
+            except OSError:
+                pass
+        return diff
+
+    # Update every index for the diff; returns the changed rows' cells, old
+    # and new, per searchable column, and the Eald-vacha keys they touched.
+    #
+    # Every index (TermIndex, WildcardIndex, FuzzyIndex, FullTextIndex) has
+    # update(removed, added, row_map=None), which must leave it as if built
+    # from the new entries:
+    #   removed  (row, old cell) of the rows removed or edited, numbered as
+    #            before the reload; the index forgets them first
+    #   row_map  old row -> new row of every remaining row (None when no row
+    #            moved); the index renumbers what it still holds through it
+    #   added    (row, new cell) of the rows added or edited, numbered as
+    #            after the reload; the index learns them last
+    def _update_indexes(self, entries, diff):
+        removed = {col: [(row, entry[i]) for row, entry in diff.removed] for i, col in enumerate(COLUMNS)}
+        added = {col: [(row, entry[i]) for row, entry in diff.added] for i, col in enumerate(COLUMNS)}
+        keys = self.index.update(removed['Eald-vacha'], added['Eald-vacha'], diff.row_map)
+        self.entries = entries
+        self.store = EntryStore(entries)
+        # As in build_roots(), which also counts blank cells as 'nan'; a blank
+        # cell has no keys, so 'nan' is checked on every reload
+        blank = None in self.store['Eald-vacha']
+        if ('nan' in self.roots) != (blank or 'nan' in self.index.alternates or 'nan' in self.index.parts):
+            keys.add('nan')
+        for key in keys:
+            if key in self.index.alternates or key in self.index.parts or (key == 'nan' and blank):
+                self.roots.add(key)
+            else:
+                self.roots.discard(key)
+        touched = {col: index.update(removed[col], added[col], diff.row_map)
+                   for col, index in self.wildcard.items()}
+        for delta, cells in ((-1, removed['Eald-vacha']), (1, added['Eald-vacha'])):
+            for _, cell in cells:
+                for root in cell_roots(cell):
+                    self.usage[root] = self.usage.get(root, 0) + delta
+                    touched['Eald-vacha'].add(root)
+        for col, completer in self.completers.items():
+            completer.refresh(touched[col])
+        for col, index in self.fuzzy.items():
+            index.update(removed[col], added[col], diff.row_map)
+        self.fulltext.update([(row, entry[0], entry[2]) for row, entry in diff.removed],
+                             [(row, entry[0], entry[2]) for row, entry in diff.added], diff.row_map)
+        changed = {col: [cell for _, cell in removed[col] + added[col]] for col in self.wildcard}
+        return changed, keys
+
+    # Drop cached results and precomputed analyses that depend on changed entries
+    def _invalidate(self, diff, changed, keys):
+        dropped = self.cache.invalidate(_cache_invalidator(changed, keys))
+        instrument.count('reload.cache_dropped', dropped)
+        if self.decompositions is not None and keys:
+            stale = {word for word in self.decompositions.decompositions
+                     if any(key in word.lower() for key in keys)}
+            stale.update(entry[1].strip() for _, entry in diff.added if entry[1] and entry[1].strip())
+            self.decompositions.discard(stale)
+            current = _index_items(self.store)
+            self.pending.update((word, current[word]) for word in stale if word in current)
+
+    # Pick up edits to the spreadsheet; returns the applied EntryDiff, or
+    # None when the file has not changed
+    def reload(self):
+        changes = self.read_changes()
+        if changes is None:
+            return None
+        return self.apply_entries(*changes)
+
+# Predicate for QueryCache.invalidate(): does a cached result depend on any
+# of the changed cells (per searchable column) or Eald-vacha index keys?
+#   search     the changed cells matched the query, exactly or by wildcard,
+#              or (for fuzzy results) closely enough to be a fuzzy match
+#   decompose, gloss
+#              a changed key occurs in the word; every lookup made while
+#              decomposing or glossing it is for a substring of it
+#   fulltext   any row changed: BM25 scores depend on statistics of the whole
+#              dictionary, so any edit can reorder the results
+def _cache_invalidator(changed, keys):
+    wildcard = {col: WildcardIndex(cells) for col, cells in changed.items()}
+    fuzzy = {col: FuzzyIndex(cells) for col, cells in changed.items()}
+
+    def affected(key, value):
+        if key[0] in ('decompose', 'gloss'):
+            word = key[1].lower()
+            return any(k in word for k in keys)
+        if key[0] == 'fulltext':
+            return any(changed.values())
+        _, query, direction, min_score = key
+        if match_exact_wildcard(None, query, direction, wildcard):
+            return True
+        _, is_fuzzy = value
+        return is_fuzzy and bool(match_fuzzy(None, query, direction, min_score, 1, fuzzy))
+    return affected
+
+# The dictionary at file_path: a spreadsheet, loaded into memory, or a
+# lexicon database written by sqlite_backend.import_lexicon()
+def open_dictionary(file_path='dictionary.xlsx', decompositions=True, cache_size=DEFAULT_CACHE_SIZE):
+    from sqlite_backend import SqliteDictionary, is_database
+    if is_database(file_path):
+        return SqliteDictionary.load(file_path, decompositions, cache_size)
+    return Dictionary.load(file_path, decompositions, cache_size)
+
+# Roots credited to one '/'-alternate of an entry, with the score of the
+# best segmentation using them: the explicit '-'-parts when it has any,
+# otherwise the top segmentations find_possible_decompositions() reports
+def alternate_roots(dictionary, alternate, english):
+    store, index = dictionary.store, dictionary.index
+    alt = alternate.strip().lower()
+    if '-' in alt:
+        parts = [p.strip() for p in alt.split('-') if p.strip()]
+        joined = ''.join(parts)
+        if len(parts) < 2:
+            return {}
+        seg, start = [], 0
+        for p in parts:
+            seg.append((start, start + len(p), p))
+            start += len(p)
+        segmentations = [(score_segmentation(seg, joined, store, english, index), parts)]
+    elif len(alt) > 6 and not alt.startswith('nə'):
+        ranked, _ = rank_decompositions(alt, store, dictionary.roots, index)
+        segmentations = [(score, [p for _, _, p in seg]) for score, _, seg in ranked or ()]
+    else:
+        return {}
+    credits = {}
+    for score, parts in segmentations:
+        for p in parts:
+            # A negated part also counts as a use of its base
+            for root in (p, p[2:]) if p.startswith('nə') and len(p) > 2 else (p,):
+                credits[root] = max(score, credits.get(root, score))
+    return credits
+
+# (word, decomposition, [(root, score), ...], English) for one entry
+def analyse_entry(dictionary, word, english):
+    credits = {}
+    for alternate in word.split('/'):
+        for root, score in alternate_roots(dictionary, alternate, english).items():
+            credits[root] = max(score, credits.get(root, score))
+    decomposition = decompose_word(word, dictionary.store, roots=dictionary.roots, index=dictionary.index)
+    return word, decomposition, sorted(credits.items()), english
+
+# The dictionary of a decomposition-index build worker
+_worker_dictionary = None
+
+def _init_index_worker(file_path):
+    global _worker_dictionary
+    _worker_dictionary = Dictionary.load(file_path, decompositions=False)
+
+def _analyse_batch(batch):
+    return [analyse_entry(_worker_dictionary, word, english) for word, english in batch]
+
+# {word: English} of every entry to decompose, the first row of each word
+def _index_items(store):
+    items = {}
+    for english, word in zip(store['English'], store['Eald-vacha']):
+        if word is not None and word.strip() and word.strip() not in items:
+            items[word.strip()] = english if english is not None else ""
+    return items
+
+# Decompose every entry once. With jobs > 1 and a file_path, the entries are
+# spread over a process pool whose workers each load the dictionary.
+def build_decomposition_index(dictionary, jobs=1, file_path=None):
+    items = list(_index_items(dictionary.store).items())
+    if jobs <= 1 or file_path is None:
+        analyses = [analyse_entry(dictionary, word, english) for word, english in items]
+    else:
+        size = max(1, len(items) // (jobs * 8))
+        batches = [items[i:i + size] for i in range(0, len(items), size)]
+        with ProcessPoolExecutor(jobs, initializer=_init_index_worker, initargs=(file_path,)) as pool:
+            analyses = [a for batch in pool.map(_analyse_batch, batches) for a in batch]
+    return DecompositionIndex.from_analyses(analyses)
+
+# Build the decomposition index for a spreadsheet and store it next to it
+def build_and_save_decomposition_index(file_path='dictionary.xlsx', jobs=1):
+    dictionary = Dictionary.load(file_path, decompositions=False)
+    index = build_decomposition_index(dictionary, jobs, file_path)
+    source = resource_path(file_path)
+    write_decomposition_index(decomposition_index_path(source), source, index)
+    return index
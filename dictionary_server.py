@@ -0,0 +1,305 @@
+# Local JSON query server over one in-memory dictionary
+#
+#   python dictionary_server.py [--host 127.0.0.1] [--port 8765] [--unix PATH]
+#
+# The dictionary and its indexes are loaded once and shared by every request.
+# Endpoints (GET with a query string, or POST with a JSON object body):
+#   /search     q, direction=en|ev, min_score=75,        exact/wildcard search with
+#               offset=0, limit=50                       fuzzy fallback (cached)
+#   /fuzzy      q, direction, min_score=75, limit=4      fuzzy search
+#   /fulltext   q, offset=0, limit=50                    ranked keyword search over the
+#                                                        English definitions and notes (cached)
+#   /meaning    term                                     meaning of an Eald-vacha term
+#   /decompose  word                                     decompose_word() output
+#   /compounds  root                                     words built from a root
+#   /health                                              liveness and dictionary size
+# Connections are HTTP/1.1 keep-alive and may pipeline: requests on one
+# connection are handled concurrently and answered in order. Decomposition
+# and compound queries are CPU-heavy; they run on worker threads, at most
+# --max-heavy at a time, so cheap lookups are never stuck behind them.
+# Edits to the spreadsheet are picked up every --reload-interval seconds.
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from dictionary_cli import DIRECTIONS, compounds_record, decompose_record
+from dictionary_core import UNKNOWN, fuzzy_results, open_dictionary
+from query_cache import DEFAULT_CACHE_SIZE
+
+PIPELINE_DEPTH = 16
+MAX_BODY = 1 << 20
+
+
+class BadRequest(Exception):
+    pass
+
+
+class NotFound(Exception):
+    pass
+
+
+def _param(params, name, default=None, convert=str):
+    value = params.get(name, default)
+    if value is None:
+        raise BadRequest(f"missing parameter '{name}'")
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"invalid value for '{name}': {value!r}")
+
+
+def _direction(params):
+    value = _param(params, 'direction', 'en')
+    if value not in DIRECTIONS:
+        raise BadRequest(f"direction must be one of {', '.join(sorted(DIRECTIONS))}")
+    return DIRECTIONS[value]
+
+
+class DictionaryServer:
+    def __init__(self, dictionary, max_heavy=2):
+        self.dictionary = dictionary
+        self.max_heavy = max_heavy
+        self.heavy = asyncio.Semaphore(max_heavy)
+        self.executor = ThreadPoolExecutor(max_heavy, thread_name_prefix='heavy-query')
+        # Cleared while a reload updates the indexes; cheap lookups wait on it
+        self.ready = asyncio.Event()
+        self.ready.set()
+        self.watcher = None
+        # path -> (handler(params) -> JSON-able, runs on a worker thread?)
+        self.endpoints = {
+            '/search': (self.search, False),
+            '/fuzzy': (self.fuzzy, False),
+            '/fulltext': (self.fulltext, False),
+            '/meaning': (self.meaning, False),
+            '/decompose': (self.decompose, True),
+            '/compounds': (self.compounds, True),
+            '/health': (self.health, False),
+        }
+
+    def search(self, params):
+        query, direction = _param(params, 'q'), _direction(params)
+        min_score = _param(params, 'min_score', 75, float)
+        offset, limit = _param(params, 'offset', 0, int), _param(params, 'limit', 50, int)
+        results, is_fuzzy = self.dictionary.search_results(query, direction, min_score)
+        match = None if not len(results) else 'fuzzy' if is_fuzzy else 'exact'
+        return {'query': query, 'direction': direction, 'match': match, 'total': len(results),
+                'results': results.format(offset, offset + limit)}
+
+    def fuzzy(self, params):
+        query, direction = _param(params, 'q'), _direction(params)
+        min_score, limit = _param(params, 'min_score', 75, float), _param(params, 'limit', 4, int)
+        results = fuzzy_results(self.dictionary.store, query, direction, min_score, limit, self.dictionary.fuzzy)
+        return {'query': query, 'direction': direction, 'results': results.format()}
+
+    def fulltext(self, params):
+        query = _param(params, 'q')
+        offset, limit = _param(params, 'offset', 0, int), _param(params, 'limit', 50, int)
+        results = self.dictionary.fulltext_results(query)
+        return {'query': query, 'total': len(results), 'results': results.format(offset, offset + limit)}
+
+    # null for an entry with a blank English cell
+    def meaning(self, params):
+        term = _param(params, 'term')
+        meaning = self.dictionary.meaning(term)
+        if meaning == UNKNOWN:
+            raise NotFound(f"no entry for '{term}'")
+        return {'term': term, 'meaning': meaning}
+
+    def decompose(self, params):
+        return decompose_record(self.dictionary, _param(params, 'word'))
+
+    def compounds(self, params):
+        return compounds_record(self.dictionary, _param(params, 'root'))
+
+    def health(self, params):
+        cache = self.dictionary.cache
+        return {'status': 'ok', 'entries': len(self.dictionary.store),
+                'cache': {'size': len(cache), 'hits': cache.hits, 'misses': cache.misses}}
+
+    # Poll the spreadsheet for edits. It is read, and the indexes updated, on
+    # worker threads; the update holds every heavy slot and blocks cheap
+    # lookups, so no query sees the indexes half-updated.
+    async def watch(self, interval):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                changes = await loop.run_in_executor(None, self.dictionary.read_changes)
+            except Exception as e:
+                print(f"Could not reload dictionary: {e}", file=sys.stderr, flush=True)
+                continue
+            if changes is None:
+                continue
+            for _ in range(self.max_heavy):
+                await self.heavy.acquire()
+            self.ready.clear()
+            try:
+                diff = await loop.run_in_executor(None, self.dictionary.apply_entries, *changes)
+            except Exception as e:
+                print(f"Could not reload dictionary: {e}", file=sys.stderr, flush=True)
+                continue
+            finally:
+                self.ready.set()
+                for _ in range(self.max_heavy):
+                    self.heavy.release()
+            print(f"Dictionary reloaded: {len(diff.added)} rows added or edited, "
+                  f"{len(diff.removed)} replaced or removed", file=sys.stderr, flush=True)
+
+    # Start watching the spreadsheet. The task is kept here, since the loop
+    # holds only a weak reference, and restarted if it ever fails.
+    def start_watch(self, interval):
+        self.watcher = asyncio.create_task(self.watch(interval))
+        self.watcher.add_done_callback(lambda task: self.watch_done(task, interval))
+
+    def watch_done(self, task, interval):
+        if task.cancelled():
+            return
+        print(f"Reload watcher failed, restarting it: {task.exception()!r}", file=sys.stderr, flush=True)
+        self.start_watch(interval)
+
+    # (status, payload) for one request
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        endpoint = self.endpoints.get(url.path)
+        if endpoint is None:
+            return HTTPStatus.NOT_FOUND, {'error': f"no endpoint {url.path}"}
+        if method not in ('GET', 'POST'):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f"method {method} not allowed"}
+        handler, heavy = endpoint
+        try:
+            params = dict(parse_qsl(url.query))
+            if method == 'POST' and body:
+                data = json.loads(body)
+                if not isinstance(data, dict):
+                    raise BadRequest("request body must be a JSON object")
+                params.update(data)
+            if not self.ready.is_set():
+                await self.ready.wait()
+            if heavy:
+                async with self.heavy:
+                    payload = await asyncio.get_running_loop().run_in_executor(self.executor, handler, params)
+            else:
+                payload = handler(params)
+        except (BadRequest, ValueError) as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except NotFound as e:
+            return HTTPStatus.NOT_FOUND, {'error': str(e)}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(e).__name__}: {e}"}
+        return HTTPStatus.OK, payload
+
+    async def handle_connection(self, reader, writer):
+        responses = asyncio.Queue(PIPELINE_DEPTH)
+        sender = asyncio.create_task(self._send_responses(responses, writer))
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, keep_alive, body = request
+                await responses.put((asyncio.create_task(self.dispatch(method, target, body)), keep_alive))
+                if not keep_alive:
+                    break
+        except (BadRequest, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            await responses.put((_completed(HTTPStatus.BAD_REQUEST, {'error': str(e) or 'malformed request'}), False))
+        except ConnectionError:
+            pass
+        finally:
+            await responses.put(None)
+            await sender
+
+    async def _send_responses(self, responses, writer):
+        try:
+            while True:
+                item = await responses.get()
+                if item is None:
+                    break
+                task, keep_alive = item
+                status, payload = await task
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def _completed(status, payload):
+    future = asyncio.get_running_loop().create_future()
+    future.set_result((status, payload))
+    return future
+
+
+# (method, target, keep_alive, body), or None at end of stream
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise BadRequest("malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length > MAX_BODY:
+        raise BadRequest("request body too large")
+    body = await reader.readexactly(length) if length else b''
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    return method.upper(), target, keep_alive, body
+
+
+async def serve(dictionary, host='127.0.0.1', port=8765, unix=None, max_heavy=2, reload_interval=1.0):
+    server = DictionaryServer(dictionary, max_heavy)
+    if reload_interval > 0:
+        server.start_watch(reload_interval)
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle_connection, path=unix)
+    else:
+        listener = await asyncio.start_server(server.handle_connection, host, port)
+    where = unix or ', '.join(str(sock.getsockname()[:2]) for sock in listener.sockets)
+    print(f"Serving the Eald-vacha dictionary on {where}", file=sys.stderr, flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Eald-vacha dictionary lookups as JSON over HTTP.")
+    parser.add_argument('--dictionary', default='dictionary.xlsx', help="dictionary spreadsheet or lexicon database (default: %(default)s)")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=8765, help="TCP port (default: %(default)s)")
+    parser.add_argument('--unix', help="listen on this Unix socket path instead of TCP")
+    parser.add_argument('--max-heavy', type=int, default=2,
+                        help="concurrent decomposition/compound queries (default: %(default)s)")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help="cached query results (default: %(default)s)")
+    parser.add_argument('--reload-interval', type=float, default=1.0,
+                        help="seconds between checks for edits to the spreadsheet; 0 disables (default: %(default)s)")
+    args = parser.parse_args(argv)
+    dictionary = open_dictionary(args.dictionary, cache_size=args.cache_size)
+    try:
+        asyncio.run(serve(dictionary, args.host, args.port, args.unix, args.max_heavy, args.reload_interval))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
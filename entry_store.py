@@ -0,0 +1,109 @@
+# Compact in-memory store of the dictionary entries
+#
+# Holds the three columns (English, Eald-vacha, Notes) as tuples of str,
+# with None for an empty cell. A value repeated across rows (a common gloss
+# or note) is stored once; unique values are kept as they are. Rows are
+# plain positions: store['English'][row]. This replaces the pandas
+# DataFrame the app used to keep, so pandas is not imported at runtime.
+#
+# store.terms(column) splits a column's cells into '/'-alternates and
+# '-'-parts once, normalized (stripped, lowercased) and interned; the roots
+# and the term, wildcard and fuzzy indexes are built from it, so each
+# normalized alternate and part is one object however many rows and
+# indexes refer to it.
+#
+# The store protocol, which Dictionary and the index builders rely on and
+# every store (EntryStore, sqlite_backend.SqliteStore) implements:
+#   len(store)            number of rows
+#   store[column]         the column's cells, indexed by row and iterable in
+#                         row order; None for an empty cell
+#   store.terms(column)   the column's CellTerms
+import sys
+from array import array
+
+COLUMNS = ('English', 'Eald-vacha', 'Notes')
+
+
+# The cells with each repeated value replaced by its first occurrence, so
+# it is held once; unlike sys.intern, nothing is kept for unique values
+def dedupe(cells):
+    seen = {}
+    return tuple(None if cell is None else seen.setdefault(cell, cell) for cell in cells)
+
+
+# Alternates of a cell: its '/'-separated terms, stripped
+def cell_alternates(cell):
+    return [t.strip() for t in cell.split('/')]
+
+
+# A term lowercased and interned; the term itself when it already is lowercase
+def normalize(term):
+    lower = term.lower()
+    return sys.intern(term if lower == term else lower)
+
+
+# '-'-parts of a normalized alternate, stripped and interned
+def alternate_parts(alt):
+    return [sys.intern(p.strip()) for p in alt.split('-') if p.strip()]
+
+
+# The alternates of every cell of one column, split once. Row r's are at
+# positions start[r] to start[r + 1] of `alternates` (as written, stripped)
+# and `normalized`; parts(alt) gives a normalized alternate's '-'-parts.
+class CellTerms:
+    __slots__ = ('start', 'alternates', 'normalized', 'split')
+
+    def __init__(self, cells):
+        start, alternates, normalized = array('q', [0]), [], []
+        # An alternate equal to some whole cell is that cell's object
+        seen = {cell: cell for cell in cells if cell is not None}
+        for cell in cells:
+            if cell is not None:
+                for alt in cell_alternates(cell):
+                    alt = seen.setdefault(alt, alt)
+                    alternates.append(alt)
+                    normalized.append(normalize(alt))
+            start.append(len(alternates))
+        self.start = start
+        self.alternates = tuple(alternates)
+        self.normalized = tuple(normalized)
+        # Only alternates with a '-' have parts other than themselves
+        self.split = {alt: tuple(alternate_parts(alt)) for alt in set(normalized) if '-' in alt}
+
+    # (alternates, normalized alternates) of one row, in cell order
+    def row(self, row):
+        lo, hi = self.start[row], self.start[row + 1]
+        return self.alternates[lo:hi], self.normalized[lo:hi]
+
+    def parts(self, alt):
+        return self.split[alt] if '-' in alt else (alt,) if alt else ()
+
+
+class EntryStore:
+    __slots__ = ('columns', 'split')
+
+    def __init__(self, entries):
+        # entries: (English, Eald-vacha, Notes) tuples, None for empty cells
+        columns = zip(*entries) if entries else ((),) * len(COLUMNS)
+        self.columns = {name: dedupe(cells) for name, cells in zip(COLUMNS, columns)}
+        self.split = {}
+
+    # CellTerms of one column, computed on first use
+    def terms(self, column):
+        terms = self.split.get(column)
+        if terms is None:
+            terms = self.split[column] = CellTerms(self.columns[column])
+        return terms
+
+    def __len__(self):
+        return len(self.columns['English'])
+
+    # The cells of one column, indexed by row
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def row(self, row):
+        return tuple(cells[row] for cells in self.columns.values())
+
+    def entries(self):
+        return list(zip(*self.columns.values()))
@@ -0,0 +1,137 @@
+# Ranked full-text search over the English definitions and notes
+#
+# Each row's English cell and Notes are split into lowercase words; stop
+# words are dropped and the rest reduced to a stem (stem()), so "walking",
+# "walked" and "walks" all find "Walk". The inverted index maps each stem to
+# its postings, {row: weighted term frequency}, a word in the English cell
+# counting FIELD_WEIGHTS['English'] times as much as one in the notes.
+# A query is tokenized the same way and every stem must occur in a row (AND).
+# Candidates come from intersecting the posting lists, shortest first, and
+# are ranked by BM25, so the cost follows the postings of the query terms
+# rather than the size of the dictionary. update() applies a reload
+# incrementally, like the other indexes.
+import heapq
+import math
+import re
+import sys
+
+import instrument
+
+FIELD_WEIGHTS = {'English': 2, 'Notes': 1}
+K1 = 1.2
+B = 0.75
+
+STOP_WORDS = frozenset('a an and as at be by for from in is it of on or the to with'.split())
+WORD = re.compile(r"[^\W_]+")
+VOWELS = frozenset('aeiouy')
+# Endings stem() removes, with the shortest stem each may leave
+SUFFIXES = (('ingly', 3), ('edly', 3), ('ment', 3), ('ing', 2), ('ed', 2), ('ly', 3))
+
+
+# Light English stemmer: plural endings, then verb and adverb endings (as
+# long as a stem with a vowel is left; again after each one, so
+# commenting -> comment -> com), then a final 'e', so inflected forms and
+# their base share a stem (hope/hoped/hoping -> hop); a base of two
+# letters keeps its 'e' instead (use/used/using -> use).
+# 'eed' becomes 'ee' and a final 'ee' stays, so agree, agreed and
+# agreement share 'agree' and speed and speeding share 'spee'.
+def stem(word):
+    if len(word) > 3:
+        if word.endswith('ies') and len(word) > 4:
+            word = word[:-3] + 'y'
+        elif word.endswith('sses'):
+            word = word[:-2]
+        elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+            word = word[:-1]
+        stripped = True
+        while stripped:
+            stripped = False
+            if word.endswith('eed'):
+                word = word[:-1]
+            for suffix, shortest in SUFFIXES:
+                base = word[:-len(suffix)]
+                if word.endswith(suffix) and len(base) >= shortest and VOWELS.intersection(base):
+                    word = base
+                    # Undouble: hopping -> hopp -> hop
+                    if len(word) > 2 and word[-1] == word[-2] and word[-1] not in 'elsz':
+                        word = word[:-1]
+                    # Restore the 'e' of a short base: using -> us -> use
+                    elif len(word) == 2 and word[-1] not in VOWELS:
+                        word += 'e'
+                    stripped = True
+                    break
+    if word.endswith('e') and not word.endswith('ee') and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+# Stems of a text, in order, without stop words
+def tokenize(text):
+    return [sys.intern(stem(w)) for w in WORD.findall(text.lower()) if w not in STOP_WORDS]
+
+
+class FullTextIndex:
+    def __init__(self, english=(), notes=()):
+        self.postings = {}
+        self.lengths = {}
+        self.total = 0
+        for row, (eng, note) in enumerate(zip(english, notes)):
+            self._add(row, eng, note)
+
+    # {stem: weighted frequency} of one row
+    @staticmethod
+    def _terms(english, notes):
+        terms = {}
+        for field, text in (('English', english), ('Notes', notes)):
+            if text is None:
+                continue
+            for term in tokenize(text):
+                terms[term] = terms.get(term, 0) + FIELD_WEIGHTS[field]
+        return terms
+
+    def _add(self, row, english, notes):
+        terms = self._terms(english, notes)
+        if not terms:
+            return
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[row] = tf
+        self.lengths[row] = sum(terms.values())
+        self.total += self.lengths[row]
+
+    # Apply a reload (see dictionary_core.Dictionary._update_indexes), with
+    # rows given as (row, English, Notes)
+    def update(self, removed, added, row_map=None):
+        for row, english, notes in removed:
+            for term in self._terms(english, notes):
+                postings = self.postings[term]
+                del postings[row]
+                if not postings:
+                    del self.postings[term]
+            self.total -= self.lengths.pop(row, 0)
+        if row_map is not None:
+            self.postings = {term: {row_map[row]: tf for row, tf in postings.items()}
+                             for term, postings in self.postings.items()}
+            self.lengths = {row_map[row]: length for row, length in self.lengths.items()}
+        for row, english, notes in added:
+            self._add(row, english, notes)
+
+    # Rows containing every stem of `query`, as (score, row) best first,
+    # then in dictionary order; at most `limit` of them
+    def search(self, query, limit=None):
+        terms = sorted(set(tokenize(query)), key=lambda t: len(self.postings.get(t, ())))
+        if not terms or terms[0] not in self.postings:
+            return []
+        lists = [self.postings[t] for t in terms]
+        rows = [row for row in lists[0] if all(row in postings for postings in lists[1:])]
+        instrument.count('fulltext.candidates', len(lists[0]))
+        instrument.count('fulltext.matches', len(rows))
+        count, average = len(self.lengths), self.total / len(self.lengths)
+        idf = [math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)) for postings in lists]
+        scored = []
+        for row in rows:
+            norm = K1 * (1 - B + B * self.lengths[row] / average)
+            score = sum(w * postings[row] * (K1 + 1) / (postings[row] + norm)
+                        for w, postings in zip(idf, lists))
+            scored.append((-score, row))
+        best = sorted(scored) if limit is None else heapq.nsmallest(limit, scored)
+        return [(-score, row) for score, row in best]
@@ -0,0 +1,167 @@
+# Pruned top-k fuzzy matcher for one dictionary column
+#
+# Scores are difflib.SequenceMatcher(None, query, term).ratio() * 100, as in
+# the original linear scan, but only for terms that can still make the cut:
+#   1. length bounds: ratio <= 2 * min(la, lb) / (la + lb), so only terms in
+#      a contiguous length window (terms are kept sorted by length) qualify
+#   2. character-count bound: the matched characters can't exceed the
+#      multiset intersection of both strings (SequenceMatcher.quick_ratio),
+#      computed for the whole window at once from a per-term count matrix
+#   3. survivors are scored in decreasing bound order against a bounded
+#      heap of the best `limit` entries, stopping once no remaining bound
+#      can beat the current k-th score. They are scored in chunks, each
+#      one in a single batch (similarity.py), and the chunks grow so a
+#      search that stops early wastes little; a chunk never takes a term
+#      whose bound is already below the heap's worst score.
+import heapq
+import math
+from collections import Counter
+
+import numpy as np
+
+import instrument
+from entry_store import cell_alternates, normalize
+from similarity import Similarity
+
+# Slack for float rounding when comparing bounds against real scores
+EPS = 1e-9
+
+
+class FuzzyIndex:
+    # `terms`, the cells' CellTerms, saves splitting them again
+    def __init__(self, cells, terms=None):
+        # Each distinct lowercased term with its (row, position, original term,
+        # cell) uses
+        uses = {}
+        for row, cell in enumerate(cells):
+            if cell is None:
+                continue
+            if terms is None:
+                alternates = cell_alternates(cell)
+                normalized = map(normalize, alternates)
+            else:
+                alternates, normalized = terms.row(row)
+            for pos, (term, key) in enumerate(zip(alternates, normalized)):
+                uses.setdefault(key, []).append((row, pos, term, cell))
+        self.terms = sorted(uses, key=len)
+        self.uses = [uses[t] for t in self.terms]
+        self.lengths = np.fromiter(map(len, self.terms), dtype=np.int64, count=len(self.terms))
+
+        self.alphabet = {}
+        self.counts = self._count_matrix(self.terms, 1)
+
+    # Character counts of `terms` (one row each, capped at 255), at least
+    # `width` columns wide; the alphabet grows with any new characters
+    def _count_matrix(self, terms, width):
+        for term in terms:
+            for ch in term:
+                self.alphabet.setdefault(ch, len(self.alphabet))
+        counts = np.zeros((len(terms), max(len(self.alphabet), width)), dtype=np.uint8)
+        for tid, term in enumerate(terms):
+            for ch, n in Counter(term).items():
+                counts[tid, self.alphabet[ch]] = min(n, 255)
+        return counts
+
+    # Apply a reload (see dictionary_core.Dictionary._update_indexes); terms
+    # left without uses are dropped and new ones merged in by length
+    def update(self, removed, added, row_map=None):
+        tids = {term: tid for tid, term in enumerate(self.terms)}
+        uses = self.uses
+        for row, cell in removed:
+            if cell is None:
+                continue
+            for term in {t.lower() for t in cell_alternates(cell)}:
+                tid = tids[term]
+                uses[tid] = [use for use in uses[tid] if use[0] != row]
+        if row_map is not None:
+            uses = [[(row_map[row], pos, term, cell) for row, pos, term, cell in used] for used in uses]
+        new, grown = {}, set()
+        for row, cell in added:
+            if cell is None:
+                continue
+            for pos, term in enumerate(cell_alternates(cell)):
+                tid = tids.get(term.lower())
+                if tid is None:
+                    new.setdefault(normalize(term), []).append((row, pos, term, cell))
+                else:
+                    uses[tid].append((row, pos, term, cell))
+                    grown.add(tid)
+        for tid in grown:
+            uses[tid].sort()
+
+        new_terms = list(new)
+        counts = self._count_matrix(new_terms, self.counts.shape[1])
+        old_counts = self.counts
+        if counts.shape[1] > old_counts.shape[1]:
+            old_counts = np.pad(old_counts, ((0, 0), (0, counts.shape[1] - old_counts.shape[1])))
+        terms = self.terms + new_terms
+        uses = uses + [new[t] for t in new_terms]
+        keep = sorted((tid for tid in range(len(terms)) if uses[tid]), key=lambda tid: len(terms[tid]))
+        self.terms = [terms[tid] for tid in keep]
+        self.uses = [uses[tid] for tid in keep]
+        self.lengths = np.fromiter(map(len, self.terms), dtype=np.int64, count=len(self.terms))
+        self.counts = np.vstack([old_counts, counts])[keep]
+
+    # Best `limit` entries scoring >= min_score, as (score, row, term) sorted
+    # by score descending then dictionary order. As in the original scan,
+    # rows whose cells have the same text count as one entry: only the
+    # best-scoring (then first) term of each cell text is kept
+    def search(self, query, min_score, limit):
+        la = len(query)
+        if la == 0 or limit <= 0:
+            return []
+        s = max(min_score, 0)
+        lo = math.ceil(s * la / (200 - s) - EPS) if s < 200 else la
+        hi = math.floor(la * (200 - s) / s + EPS) if s > 0 else int(self.lengths[-1:].max(initial=0))
+        start, stop = np.searchsorted(self.lengths, [lo, hi + 1])
+        if start >= stop:
+            return []
+
+        shared = np.zeros(stop - start, dtype=np.int64)
+        for ch, n in Counter(query).items():
+            col = self.alphabet.get(ch)
+            if col is not None:
+                shared += np.minimum(self.counts[start:stop, col], n)
+        bounds = 200.0 * shared / (la + self.lengths[start:stop])
+        keep = np.flatnonzero(bounds >= min_score - EPS)
+        keep = keep[np.argsort(-bounds[keep], kind='stable')]
+        instrument.count('fuzzy.window', int(stop - start))
+        instrument.count('fuzzy.candidates', len(keep))
+
+        heap = []   # worst kept entry first: (score, -row, -pos, term, cell)
+        best = {}   # cell -> its heap entry
+        similarity = Similarity(query)
+        scores = np.empty(len(keep))
+        scored = 0
+        for n, i in enumerate(keep):
+            if len(heap) == limit and bounds[i] < heap[0][0] - EPS:
+                break
+            if n == scored:
+                size = max(limit, scored)
+                if len(heap) == limit:
+                    size = min(size, int(np.searchsorted(-bounds[keep[n:n + size]], -(heap[0][0] - EPS),
+                                                         side='right')))
+                chunk = keep[n:n + size]
+                scores[n:n + len(chunk)] = similarity.ratios([self.terms[start + j] for j in chunk]) * 100
+                scored += len(chunk)
+            tid = start + i
+            score = float(scores[n])
+            if score < min_score:
+                continue
+            for row, pos, term, cell in self.uses[tid]:
+                item = (score, -row, -pos, term, cell)
+                old = best.get(cell)
+                if old is not None:
+                    if item[:3] <= old[:3]:
+                        continue
+                    heap.remove(old)
+                    heapq.heapify(heap)
+                elif len(heap) == limit:
+                    if item[:2] <= heap[0][:2]:
+                        continue
+                    del best[heapq.heappop(heap)[4]]
+                heapq.heappush(heap, item)
+                best[cell] = item
+        instrument.count('fuzzy.ratio_calls', scored)
+        ranked = sorted(heap, key=lambda item: (-item[0], -item[1]))
+        return [(score, -neg_row, term) for score, neg_row, _, term, _ in ranked]
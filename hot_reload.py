@@ -0,0 +1,76 @@
+# Detecting and diffing edits to the dictionary spreadsheet
+#
+# FileWatcher notices that the file changed on disk (by polling its size and
+# mtime, which is cheap enough to do every second). diff_entries() then
+# aligns the old and new rows so the indexes only have to forget the rows
+# that were removed or edited, renumber the rest, and learn the new ones.
+import difflib
+import os
+
+
+class FileWatcher:
+    def __init__(self, path):
+        self.path = path
+        self.seen = self.stamp()
+
+    def stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    # The file's new stamp if it changed since `seen`, else None. The caller
+    # sets `seen` to it once the new contents have been loaded, so a failed
+    # read (e.g. of a half-saved file) is retried on the next poll.
+    def check(self):
+        stamp = self.stamp()
+        if stamp is None or stamp == self.seen:
+            return None
+        return stamp
+
+
+class EntryDiff:
+    def __init__(self, row_map, removed, added):
+        # row_map: new row of every old row, None for removed rows; None
+        #          when no surviving row moved
+        # removed: [(old_row, entry)] of deleted or edited rows
+        # added:   [(new_row, entry)] of inserted or edited rows
+        self.row_map = row_map
+        self.removed = removed
+        self.added = added
+
+    def __bool__(self):
+        return bool(self.removed or self.added)
+
+
+# Align two lists of (English, Eald-vacha, Notes) entries. Rows are compared
+# whole, so an edited row counts as removed and re-added.
+def diff_entries(old, new):
+    # Edits are usually local: align only what lies between the common
+    # prefix and suffix
+    head = 0
+    limit = min(len(old), len(new))
+    while head < limit and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+    old_mid, new_mid = old[head:len(old) - tail], new[head:len(new) - tail]
+
+    row_map = list(range(head)) + [None] * (len(old) - head)
+    removed, added = [], []
+    matcher = difflib.SequenceMatcher(None, old_mid, new_mid, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == 'equal':
+            for k in range(i2 - i1):
+                row_map[head + i1 + k] = head + j1 + k
+            continue
+        removed.extend((head + i, old[head + i]) for i in range(i1, i2))
+        added.extend((head + j, new[head + j]) for j in range(j1, j2))
+    shift = len(new) - len(old)
+    for i in range(len(old) - tail, len(old)):
+        row_map[i] = i + shift
+    if all(row_map[i] == i for i in range(len(old)) if row_map[i] is not None):
+        row_map = None
+    return EntryDiff(row_map, removed, added)
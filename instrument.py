@@ -0,0 +1,137 @@
+# Per-stage timers and counters for the load, index, search and decompose paths
+#
+# Measured code marks its stages and counts its work:
+#
+#   with instrument.stage('search.fuzzy'):
+#       ...
+#   instrument.count('fuzzy.ratio_calls', n)
+#
+# and whoever wants the numbers records them on the current thread:
+#
+#   with instrument.recording() as recorder:
+#       dictionary.search(...)
+#   recorder.report()   # JSON-able {'timers': {...}, 'counters': {...}}
+#
+# While nothing is being recorded anywhere, stage() and count() return after
+# checking one global, so the instrumentation can stay in hot paths. Counts
+# in tight loops are kept in a local variable and reported once.
+import threading
+import time
+from contextlib import contextmanager
+
+_active = 0
+_active_lock = threading.Lock()
+_local = threading.local()
+
+
+class Recorder:
+    def __init__(self):
+        self.timers = {}     # name -> [calls, total seconds, max seconds]
+        self.counters = {}   # name -> count
+
+    def add_time(self, name, seconds, calls=1):
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [calls, seconds, seconds]
+        else:
+            timer[0] += calls
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def add_count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self):
+        return {
+            'timers': {name: {'calls': calls, 'total_ms': round(total * 1000, 3), 'max_ms': round(peak * 1000, 3)}
+                       for name, (calls, total, peak) in sorted(self.timers.items())},
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    # Fold in another recorder's report() (e.g. from a worker process)
+    def merge(self, report):
+        for name, timer in report['timers'].items():
+            calls, total, peak = self.timers.get(name, (0, 0.0, 0.0))
+            self.timers[name] = [calls + timer['calls'], total + timer['total_ms'] / 1000,
+                                 max(peak, timer['max_ms'] / 1000)]
+        for name, n in report['counters'].items():
+            self.add_count(name, n)
+
+    # report(), then start over
+    def take(self):
+        report = self.report()
+        self.timers, self.counters = {}, {}
+        return report
+
+    # One line for a status bar: the slowest stages, then the counters
+    def summary(self, stages=3):
+        slowest = sorted(self.timers.items(), key=lambda item: -item[1][1])[:stages]
+        text = ", ".join(f"{name} {total * 1000:.1f} ms" for name, (_, total, _) in slowest)
+        if self.counters:
+            text += " · " + ", ".join(f"{name} {n}" for name, n in sorted(self.counters.items()))
+        return text
+
+
+class _Stage:
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.recorder.add_time(self.name, time.perf_counter() - self.start)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def _recorder():
+    return getattr(_local, 'recorder', None)
+
+
+# Time the enclosed block under `name`
+def stage(name):
+    if not _active:
+        return _NO_STAGE
+    recorder = _recorder()
+    return _NO_STAGE if recorder is None else _Stage(recorder, name)
+
+
+def count(name, n=1):
+    if _active:
+        recorder = _recorder()
+        if recorder is not None:
+            recorder.add_count(name, n)
+
+
+# Record stages and counts on this thread into `recorder` (a new one by
+# default) until the block exits
+@contextmanager
+def recording(recorder=None):
+    global _active
+    if recorder is None:
+        recorder = Recorder()
+    previous = _recorder()
+    _local.recorder = recorder
+    with _active_lock:
+        _active += 1
+    try:
+        yield recorder
+    finally:
+        with _active_lock:
+            _active -= 1
+        _local.recorder = previous
@@ -0,0 +1,59 @@
+# Streaming interlinear glossing of Eald-vacha text
+#
+# interlinear() turns a stream of text lines into glossed blocks, yielding
+# each block as soon as its line is done, so any length of text goes
+# through in one pass:
+#
+#   Wodar nəgrah dalilyantra.            the line as written
+#   Wodar  nə-grah  dalil-yantra         its words split into morphemes
+#   water  NEG-get  guide-machine        a gloss for each morpheme
+#
+# The two lower tiers are aligned word by word and wrapped at `width`.
+# Words are glossed by a callable, Dictionary.gloss, which caches each
+# distinct word. Running text repeats the same words heavily, so most
+# words are cache hits, and memory is bounded by the cache size, not by
+# the length of the text.
+import re
+from itertools import chain
+
+# Words, with '-'-compounds and inner apostrophes (ha'sward) kept whole;
+# digits and other punctuation are skipped
+WORD = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+GAP = 2
+SEP = ' ' * GAP
+
+
+def tokens(line):
+    for match in WORD.finditer(line):
+        yield match.group()
+
+
+# Rows of the two aligned tiers for an iterable of (morphemes, glosses)
+def aligned(columns, width):
+    top, bottom, used = [], [], 0
+    for morphemes, glosses in columns:
+        size = max(len(morphemes), len(glosses))
+        if top and used + size > width:
+            yield SEP.join(top).rstrip()
+            yield SEP.join(bottom).rstrip()
+            top, bottom, used = [], [], 0
+        top.append(morphemes.ljust(size))
+        bottom.append(glosses.ljust(size))
+        used += size + GAP
+    if top:
+        yield SEP.join(top).rstrip()
+        yield SEP.join(bottom).rstrip()
+
+
+# Output lines for the text `lines`: each non-blank line, its aligned
+# tiers and a blank separator line
+def interlinear(lines, gloss, width=78):
+    for line in lines:
+        line = line.rstrip('\r\n')
+        columns = map(gloss, tokens(line))
+        first = next(columns, None)
+        if first is None:
+            continue
+        yield line
+        yield from aligned(chain([first], columns), width)
+        yield ''
@@ -0,0 +1,56 @@
+# Size-bounded LRU cache for query results
+#
+# Keys are tuples whose first item names the kind of query, e.g.
+# ('search', query, direction, min_score) or ('decompose', word). When the
+# dictionary is reloaded, invalidate() drops just the entries whose key the
+# caller reports as touching a changed term; everything else stays warm.
+# A lock makes it safe to share between a server's event loop and its
+# worker threads.
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class QueryCache:
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Cached value for key, or `default`; a hit makes the entry most recent
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self.entries.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    # Drop every entry for which affected(key, value) is true; returns how many
+    def invalidate(self, affected):
+        with self._lock:
+            stale = [key for key, value in self.entries.items() if affected(key, value)]
+            for key in stale:
+                del self.entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
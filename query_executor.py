@@ -0,0 +1,122 @@
+# Runs dictionary queries off the Tk event loop
+#
+# Jobs run one at a time on a background thread. Tk widgets may only be
+# touched from the Tk thread, so results and progress messages go through a
+# queue that the Tk thread drains with root.after(). Submitting a job
+# cancels the one before it: its result is dropped, and work that checks
+# job.check() between steps stops at the next check.
+import queue
+import threading
+
+import instrument
+
+POLL_MS = 25
+
+
+class Cancelled(Exception):
+    pass
+
+
+class QueryJob:
+    def __init__(self, events, profiled=True):
+        self._events = events
+        self.profiled = profiled
+        self._cancelled = threading.Event()
+        # Stage timings and counts of the work (an instrument.Recorder)
+        self.profile = None
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise Cancelled()
+
+    # Report progress to the Tk thread (on_progress of submit())
+    def progress(self, message):
+        self._events.put((self, 'progress', message))
+
+
+class QueryExecutor:
+    # on_busy(busy, message) is called on the Tk thread when the executor
+    # starts or stops working; on_profile(job), if given, after each
+    # completed job submitted with profile=True, whose work was recorded
+    # into job.profile
+    def __init__(self, root, on_busy=None, on_profile=None):
+        self.root = root
+        self.on_busy = on_busy
+        self.on_profile = on_profile
+        self.current = None
+        self._handlers = {}
+        self._jobs = queue.Queue()
+        self._events = queue.Queue()
+        threading.Thread(target=self._work, name='query-executor', daemon=True).start()
+        self.root.after(POLL_MS, self._poll)
+
+    # Run work(job) on the worker thread, then on_done(result) on the Tk
+    # thread unless the job was superseded in the meantime. on_error(exc)
+    # receives exceptions raised by work. profile=False leaves the job out
+    # of on_profile, for work that is not a query (such as a reload).
+    def submit(self, work, on_done, on_progress=None, on_error=None, message="Working…", profile=True):
+        if self.current is not None:
+            self.current.cancel()
+        job = self.current = QueryJob(self._events, profile and self.on_profile is not None)
+        self._handlers[job] = (on_done, on_progress, on_error)
+        if self.on_busy:
+            self.on_busy(True, message)
+        self._jobs.put((job, work))
+        return job
+
+    @property
+    def busy(self):
+        return self.current is not None
+
+    def _work(self):
+        while True:
+            job, work = self._jobs.get()
+            if job.cancelled:
+                self._events.put((job, 'cancelled', None))
+                continue
+            try:
+                if not job.profiled:
+                    result = work(job)
+                else:
+                    with instrument.recording() as job.profile:
+                        with instrument.stage('total'):
+                            result = work(job)
+                self._events.put((job, 'done', result))
+            except Cancelled:
+                self._events.put((job, 'cancelled', None))
+            except Exception as e:
+                self._events.put((job, 'error', e))
+
+    def _poll(self):
+        try:
+            while True:
+                job, kind, payload = self._events.get_nowait()
+                if kind == 'progress':
+                    handlers = self._handlers.get(job)
+                    if handlers and handlers[1] and not job.cancelled:
+                        handlers[1](payload)
+                    continue
+                on_done, _, on_error = self._handlers.pop(job, (None, None, None))
+                if job is not self.current:
+                    continue
+                self.current = None
+                if self.on_busy:
+                    self.on_busy(False, "")
+                if kind == 'done':
+                    on_done(payload)
+                    if job.profiled:
+                        self.on_profile(job)
+                elif kind == 'error' and on_error:
+                    on_error(payload)
+        except queue.Empty:
+            pass
+        finally:
+            # Keep polling even if a callback raised (Tk reports the error)
+            self.root.after(POLL_MS, self._poll)
@@ -0,0 +1,137 @@
+# Segmentation of a word into known roots
+#
+# RootTrie walks the word once per start position instead of slicing and
+# probing every substring. SegmentationDAG memoizes, for every position,
+# which roots start there and the most parts any segmentation of the rest
+# can have, so dead ends are never explored and segmentations are generated
+# lazily. best_segmentations() runs a branch-and-bound search over the DAG
+# for the top-k, with a hard cap on the number of candidates scored.
+
+MIN_PART = 3
+MAX_CANDIDATES = 20000
+
+
+class RootTrie:
+    def __init__(self, roots=()):
+        self.roots = set()
+        self.trie = {}
+        for root in roots:
+            self.add(root)
+
+    def add(self, root):
+        self.roots.add(root)
+        node = self.trie
+        for ch in root:
+            node = node.setdefault(ch, {})
+        node[None] = True
+
+    def discard(self, root):
+        if root not in self.roots:
+            return
+        self.roots.discard(root)
+        path = [self.trie]
+        for ch in root:
+            path.append(path[-1][ch])
+        del path[-1][None]
+        # Prune the branches that no longer lead to any root
+        for i in range(len(root) - 1, -1, -1):
+            if path[i + 1]:
+                break
+            del path[i][root[i]]
+
+    def __contains__(self, root):
+        return root in self.roots
+
+    def __iter__(self):
+        return iter(self.roots)
+
+    def __len__(self):
+        return len(self.roots)
+
+    # End positions j > start + MIN_PART - 1 where word[start:j] is a root
+    def ends(self, word, start):
+        node = self.trie
+        found = []
+        for j in range(start, len(word)):
+            node = node.get(word[j])
+            if node is None:
+                break
+            if None in node and j + 1 - start >= MIN_PART:
+                found.append(j + 1)
+        return found
+
+
+class SegmentationDAG:
+    def __init__(self, word, roots):
+        self.word = word
+        n = self.n = len(word)
+        if isinstance(roots, RootTrie):
+            self.edges = [roots.ends(word, i) for i in range(n)]
+        else:
+            self.edges = [[j for j in range(i + MIN_PART, n + 1) if word[i:j] in roots]
+                          for i in range(n)]
+        # Most parts in any path from i to the end; -1 when the end is unreachable
+        self.max_parts = [-1] * (n + 1)
+        self.max_parts[n] = 0
+        for i in range(n - 1, -1, -1):
+            best = [self.max_parts[j] for j in self.edges[i] if self.max_parts[j] >= 0]
+            if best:
+                self.max_parts[i] = max(best) + 1
+        for i in range(n):
+            self.edges[i] = [j for j in self.edges[i] if self.max_parts[j] >= 0]
+
+    # Lazily yield every segmentation of at least min_parts parts, as lists of
+    # (start, end, part), in the order of the original recursive search.
+    # prune(path, i) may return True to skip all completions of a partial path.
+    def segmentations(self, min_parts=2, prune=None):
+        if self.n == 0 or self.max_parts[0] < min_parts:
+            return
+        path = []
+        stack = [(0, iter(self.edges[0]))]
+        while stack:
+            start, ends = stack[-1]
+            end = next(ends, None)
+            if end is None:
+                stack.pop()
+                if path:
+                    path.pop()
+                continue
+            path.append((start, end, self.word[start:end]))
+            if end == self.n:
+                if len(path) >= min_parts:
+                    yield list(path)
+                path.pop()
+            elif len(path) + self.max_parts[end] < min_parts or (prune and prune(path, end)):
+                path.pop()
+            else:
+                stack.append((end, iter(self.edges[end])))
+
+
+# Top-k segmentations by key(seg) = (score, label), highest first, keeping
+# only scores above `floor`. upper_bound(path, max_more) must never be less
+# than the score of any completion of `path` having at most max_more further
+# parts. Returns (ranked list of (score, label, seg), truncated), where
+# truncated means the candidate cap was hit before the search finished.
+def best_segmentations(dag, key, upper_bound, k=3, floor=25, max_candidates=MAX_CANDIDATES):
+    top = []
+
+    def prune(path, i):
+        bound = upper_bound(path, dag.max_parts[i])
+        if bound <= floor:
+            return True
+        return len(top) == k and bound < top[-1][0]
+
+    scored = 0
+    truncated = False
+    for seg in dag.segmentations(prune=prune):
+        if scored == max_candidates:
+            truncated = True
+            break
+        scored += 1
+        score, label = key(seg)
+        if score <= floor or (len(top) == k and (score, label) <= top[-1][:2]):
+            continue
+        top.append((score, label, seg))
+        top.sort(key=lambda item: item[:2], reverse=True)
+        del top[k:]
+    return top, truncated
@@ -0,0 +1,155 @@
+# Batched difflib.SequenceMatcher(None, a, b).ratio()
+#
+# Similarity(query) scores one string against a batch of candidates and
+# gives exactly the ratios SequenceMatcher(None, query, candidate) would,
+# as a NumPy array. The query is encoded once, on first use, and reused for
+# every batch.
+#
+# SequenceMatcher counts the characters of its matching blocks: the longest
+# common substring of a and b (the one starting earliest in a, then in b),
+# then the same on each side of it. Here the whole batch goes through that
+# in a few NumPy passes:
+#   1. run[n, i, j], the length of the common substring of pair n ending at
+#      a[i] and b[j], one row of a at a time for all pairs together
+#   2. only the cells where a[i] == b[j] are kept, each labelled with the
+#      pending (a, b) range it lies in; ranges are disjoint, so a cell is in
+#      at most one
+#   3. each round finds the longest match in every range of every pair at
+#      once: a run is cut off at its range's start, and the first maximum in
+#      row-major order is the one that starts earliest in a, then in b.
+#      Cells before and after the match (in both strings) are relabelled
+#      into the two ranges of the next round; the rest are dropped.
+# SequenceMatcher's "autojunk" treats the popular characters of a b of 200
+# or more characters as junk, which step 3 does not model; such pairs, and
+# batches (or bands of similar lengths) too small to be worth a NumPy pass,
+# are scored by difflib itself.
+import difflib
+
+import numpy as np
+
+# Length of b from which SequenceMatcher's autojunk heuristic applies
+AUTOJUNK_MIN = 200
+# Smaller batches are scored one by one with difflib, which is faster for
+# them: a NumPy pass costs about a millisecond however few candidates it has
+MIN_BATCH = 100
+# Cells (pairs x len(a) x len(b)) per NumPy pass, to bound memory
+MAX_CELLS = 1 << 21
+# A pass takes candidates up to BAND times (plus 2) as long as its shortest
+BAND = 1.5
+# Paddings, outside Unicode, so they match nothing and not each other
+PAD_A = 0x110000
+PAD_B = 0x110001
+
+
+# Code points of `strings` as one row each, padded with `pad`, and their lengths
+def encode(strings, pad):
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+    width = max(int(lengths.max(initial=0)), 1)
+    codes = np.full((len(strings), width), pad, dtype=np.uint32)
+    flat = np.frombuffer(''.join(strings).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    codes[np.arange(width) < lengths[:, None]] = flat
+    return codes, lengths
+
+
+# Matching characters of each pair, as SequenceMatcher.get_matching_blocks()
+# counts them. a and b are (codes, lengths) of one string, broadcast over
+# the batch, or of as many strings as the other side has.
+def match_counts(a, b):
+    (codes_a, _), (codes_b, _) = a, b
+    n = max(len(codes_a), len(codes_b))
+    wa, wb = codes_a.shape[1], codes_b.shape[1]
+    equal = codes_a[:, :, None] == codes_b[:, None, :]
+    run = np.zeros((n, wa + 1, wb + 1), dtype=np.uint8 if max(wa, wb) < 255 else np.int16)
+    for i in range(wa):
+        np.multiply(run[:, i, :-1] + 1, equal[:, i, :], out=run[:, i + 1, 1:])
+    # Cells where a[i] == b[j], in (pair, i, j) order, with the length of
+    # the run ending there
+    cell = np.flatnonzero(equal)
+    pair, cell_i = np.divmod(cell, wa * wb)
+    cell_i, cell_j = np.divmod(cell_i, wb)
+    cell_run = run.reshape(-1)[pair * ((wa + 1) * (wb + 1)) + (cell_i + 1) * (wb + 1) + cell_j + 1]
+    cell_run = cell_run.astype(np.int64)
+    # Larger than any cell number, to rank (size, -cell) in one integer
+    scale = len(cell) + 1
+
+    # The ranges still to search are disjoint, so each cell is in at most
+    # one; `label` numbers it, and the cells of a range stay contiguous
+    # (a left range's cells come before its sibling's in (i, j) order)
+    matched = np.zeros(n, dtype=np.int64)
+    cell = np.arange(len(cell))
+    i, j, length, label = cell_i, cell_j, cell_run, pair
+    range_pair = np.arange(n)
+    a_lo, b_lo = np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    while len(cell):
+        # The run ending at each cell, cut to the part inside its range; the
+        # best of a range is the longest, then the first
+        size = np.minimum(length, np.minimum(i - a_lo[label], j - b_lo[label]) + 1)
+        first = np.flatnonzero(np.concatenate([[True], label[1:] != label[:-1]]))
+        best = np.maximum.reduceat(size * scale - cell, first)
+        found = -(-best // scale)
+        at = found * scale - best
+        ranges = label[first]
+        matched += np.bincount(range_pair[ranges], found, minlength=n).astype(np.int64)
+        top, start = cell_i[at] - found + 1, cell_j[at] - found + 1
+        # Split every range around its match: cells before it in both
+        # strings go to range 2 * k, cells after it to 2 * k + 1
+        k = np.cumsum(np.concatenate([[0], label[1:] != label[:-1]]))
+        left = (i < top[k]) & (j < start[k])
+        right = (i >= (top + found)[k]) & (j >= (start + found)[k])
+        keep = left | right
+        cell, i, j, length = cell[keep], i[keep], j[keep], length[keep]
+        label = (2 * k + right)[keep]
+        range_pair = np.repeat(range_pair[ranges], 2)
+        a_lo = np.stack([a_lo[ranges], top + found], axis=1).reshape(-1)
+        b_lo = np.stack([b_lo[ranges], start + found], axis=1).reshape(-1)
+    return matched
+
+
+class Similarity:
+    def __init__(self, query):
+        self.query = query
+        self.encoded = None
+        # For the pairs scored by difflib
+        self.matcher = difflib.SequenceMatcher(None, query, '')
+
+    def _ratio(self, candidate):
+        self.matcher.set_seq2(candidate)
+        return self.matcher.ratio()
+
+    # ratio() of the query against each candidate, as a float array
+    def ratios(self, candidates):
+        candidates = list(candidates)
+        if len(candidates) < MIN_BATCH:
+            return np.fromiter(map(self._ratio, candidates), dtype=np.float64, count=len(candidates))
+        result = np.empty(len(candidates), dtype=np.float64)
+        b_lengths = np.fromiter(map(len, candidates), dtype=np.int64, count=len(candidates))
+        batched = np.flatnonzero(b_lengths < AUTOJUNK_MIN)
+        if len(batched) < MIN_BATCH:
+            batched = batched[:0]
+        for k in np.setdiff1d(np.arange(len(candidates)), batched, assume_unique=True):
+            result[k] = self._ratio(candidates[k])
+        if not len(batched):
+            return result
+        # One pass per band of similar lengths, so little of it is padding,
+        # of as many candidates as MAX_CELLS allows
+        lengths = np.fromiter((len(candidates[k]) for k in batched), dtype=np.int64, count=len(batched))
+        order = np.argsort(lengths, kind='stable')
+        batched, lengths = batched[order], np.maximum(lengths[order], 1)
+        start = 0
+        while start < len(batched):
+            band = np.searchsorted(lengths, lengths[start] * BAND + 2, side='right')
+            cells = np.arange(1, band - start + 1) * lengths[start:band] * max(len(self.query), 1)
+            stop = start + max(1, int(np.searchsorted(cells, MAX_CELLS, side='right')))
+            chunk = batched[start:stop]
+            start = stop
+            if len(chunk) < MIN_BATCH:
+                result[chunk] = [self._ratio(candidates[k]) for k in chunk]
+                continue
+            if self.encoded is None:
+                self.encoded = encode([self.query], PAD_A)
+            others = encode([candidates[k] for k in chunk], PAD_B)
+            matched = match_counts(self.encoded, others)
+            total = len(self.query) + others[1]
+            # As SequenceMatcher: 2.0 * matches / length, 1.0 for two empty strings
+            result[chunk] = np.where(total > 0, 2.0 * matched / np.maximum(total, 1), 1.0)
+        return result
@@ -0,0 +1,193 @@
+# Compiled binary snapshot of dictionary.xlsx
+#
+# Layout (little-endian):
+#   header   magic, format version, source mtime_ns, source size, source sha256,
+#            section count
+#   sections name (16 bytes), offset, length -- one per section
+#   payload  u32 arrays and one UTF-8 string blob, 4-byte aligned
+#
+# Every string (cells, roots, table keys) is stored once in the blob and
+# referenced by id. The file is read through mmap, so loading it needs
+# neither pandas nor openpyxl.
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_SUFFIX = '.evsnap'
+
+MAGIC = b'EVSNAP'
+HEADER = struct.Struct('<6sHqq32sI')
+SECTION = struct.Struct('<16sQQ')
+NONE_ID = 0xFFFFFFFF
+
+
+class Snapshot:
+    __slots__ = ('entries', 'roots', 'tables')
+
+    def __init__(self, entries, roots, tables):
+        # entries: list of (English, Eald-vacha, Notes) tuples, None for empty cells
+        # roots:   set of root terms, as produced by build_roots()
+        # tables:  {name: {key: [row, ...]}} lookup tables
+        self.entries = entries
+        self.roots = roots
+        self.tables = tables
+
+
+def snapshot_path(source):
+    return os.path.splitext(source)[0] + SNAPSHOT_SUFFIX
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.digest()
+
+
+def _u32(values):
+    arr = array('I', values)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _read_u32(buf):
+    arr = array('I')
+    arr.frombytes(buf)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+# Write a snapshot for `source`; the file is replaced atomically
+def write_snapshot(path, source, entries, roots, tables):
+    strings = {}
+    pieces = []
+    offsets = [0]
+
+    def intern(s):
+        if s is None:
+            return NONE_ID
+        sid = strings.get(s)
+        if sid is None:
+            sid = strings[s] = len(pieces)
+            pieces.append(s)
+            offsets.append(offsets[-1] + len(s))
+        return sid
+
+    cells = [intern(v) for row in entries for v in row]
+    root_ids = [intern(r) for r in sorted(roots)]
+    sections = [('entries', _u32(cells)), ('roots', _u32(root_ids))]
+    for name, table in sorted(tables.items()):
+        keys, starts, rows = [], [0], []
+        for key, key_rows in table.items():
+            keys.append(intern(key))
+            rows.extend(key_rows)
+            starts.append(len(rows))
+        sections.append((f't.{name}.keys', _u32(keys)))
+        sections.append((f't.{name}.start', _u32(starts)))
+        sections.append((f't.{name}.rows', _u32(rows)))
+    sections.append(('strings.off', _u32(offsets)))
+    sections.append(('strings', ''.join(pieces).encode('utf-8')))
+    if any(len(name) > 16 for name, _ in sections):
+        raise ValueError("snapshot table names must be at most 8 characters")
+
+    st = os.stat(source)
+    header = HEADER.pack(MAGIC, SNAPSHOT_VERSION, st.st_mtime_ns, st.st_size,
+                         file_digest(source), len(sections))
+    pos = HEADER.size + SECTION.size * len(sections)
+    directory, payload = [], []
+    for name, data in sections:
+        pad = -pos % 4
+        payload.append(b'\0' * pad)
+        pos += pad
+        directory.append(SECTION.pack(name.encode('ascii'), pos, len(data)))
+        payload.append(data)
+        pos += len(data)
+
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.writelines(directory)
+        f.writelines(payload)
+    os.replace(tmp, path)
+
+
+def _is_fresh(source, mtime_ns, size, digest):
+    try:
+        st = os.stat(source)
+    except OSError:
+        # Shipped without the spreadsheet: the snapshot is all there is
+        return True
+    if st.st_size != size:
+        return False
+    if st.st_mtime_ns == mtime_ns:
+        return True
+    # Touched or copied, but maybe not edited
+    return file_digest(source) == digest
+
+
+# Load a snapshot; returns None when missing, unreadable, of another
+# version, or stale with respect to `source`
+def read_snapshot(path, source):
+    try:
+        f = open(path, 'rb')
+    except OSError:
+        return None
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        with mm:
+            try:
+                return _parse(mm, source)
+            except (struct.error, KeyError, IndexError, UnicodeDecodeError):
+                return None
+
+
+def _parse(mm, source):
+    magic, version, mtime_ns, size, digest, count = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != SNAPSHOT_VERSION:
+        return None
+    if not _is_fresh(source, mtime_ns, size, digest):
+        return None
+
+    view = memoryview(mm)
+    sections = {}
+    for i in range(count):
+        name, off, length = SECTION.unpack_from(mm, HEADER.size + i * SECTION.size)
+        sections[name.rstrip(b'\0').decode('ascii')] = view[off:off + length]
+
+    try:
+        blob = str(sections['strings'], 'utf-8')
+        offsets = _read_u32(sections['strings.off'])
+        strings = [blob[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+        strings.append(None)
+        get = strings.__getitem__
+
+        cells = [get(-1 if c == NONE_ID else c) for c in _read_u32(sections['entries'])]
+        entries = list(zip(cells[0::3], cells[1::3], cells[2::3]))
+        roots = set(map(get, _read_u32(sections['roots'])))
+
+        tables = {}
+        for name in sections:
+            if not (name.startswith('t.') and name.endswith('.keys')):
+                continue
+            table = name[2:-5]
+            keys = _read_u32(sections[name])
+            starts = _read_u32(sections[f't.{table}.start'])
+            rows = _read_u32(sections[f't.{table}.rows'])
+            tables[table] = {strings[k]: rows[starts[i]:starts[i + 1]].tolist()
+                             for i, k in enumerate(keys)}
+    finally:
+        # Release every view into the mapping before it is closed
+        for section in sections.values():
+            section.release()
+        view.release()
+    return Snapshot(entries, roots, tables)
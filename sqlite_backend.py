@@ -0,0 +1,296 @@
+# SQLite storage backend for very large (e.g. merged) lexicons
+#
+#   python dictionary_cli.py import-sqlite lexicon.sqlite base.xlsx project.xlsx
+#   python dictionary_cli.py --dictionary lexicon.sqlite search words.txt
+#
+# import_lexicon() writes the entries of one or more spreadsheets, in order,
+# into a database; SqliteDictionary then answers queries from it without
+# loading the lexicon, so opening it takes the same time at any size. The
+# same Dictionary code runs on top: the store, the Eald-vacha term index,
+# the wildcard engines and the root set are stand-ins that look rows, keys
+# and terms up in SQL through these tables:
+#   entries    (row, english, eald, notes)
+#   keys       term index: (table, key, row), b-tree on (table, key)
+#   terms      '/'-alternates per searchable column, with b-trees on the term
+#              (exact and prefix patterns) and on the term reversed (suffix)
+#   terms_fts  FTS5 trigram index over the terms (infix patterns)
+#   term_rows  (term, row) postings
+#   roots      root set for segmentation
+# Fuzzy and full-text search, which have no SQL equivalent, build their
+# in-memory indexes from the database on first use. A database is a
+# read-only build artefact: re-run the importer after editing a spreadsheet.
+import os
+import sqlite3
+import threading
+
+import instrument
+from autocomplete import MAX_CHAR
+from dictionary_core import (Dictionary, build_fulltext_index, build_fuzzy_index, build_roots,
+                             build_term_index, load_snapshot)
+from entry_store import COLUMNS, CellTerms, EntryStore
+from query_cache import DEFAULT_CACHE_SIZE, QueryCache
+from wildcard import GRAM, cell_terms
+
+SCHEMA_VERSION = 1
+DATABASE_SUFFIXES = ('.sqlite', '.sqlite3', '.db')
+# SQL column of each entry column
+FIELDS = {'English': 'english', 'Eald-vacha': 'eald', 'Notes': 'notes'}
+# Term ids per query when fetching their rows, under SQLite's variable limit
+CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE entries (row INTEGER PRIMARY KEY, english TEXT, eald TEXT, notes TEXT);
+CREATE TABLE keys (tbl TEXT, key TEXT, row INTEGER, PRIMARY KEY (tbl, key, row)) WITHOUT ROWID;
+CREATE TABLE terms (id INTEGER PRIMARY KEY, col TEXT, term TEXT, reversed TEXT);
+CREATE TABLE term_rows (term INTEGER, row INTEGER, PRIMARY KEY (term, row)) WITHOUT ROWID;
+CREATE TABLE roots (root TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE VIRTUAL TABLE terms_fts USING fts5(term, content='terms', content_rowid='id',
+                                          tokenize='trigram case_sensitive 1');
+"""
+
+INDEXES = """
+CREATE UNIQUE INDEX terms_term ON terms (col, term);
+CREATE INDEX terms_reversed ON terms (col, reversed);
+INSERT INTO terms_fts (terms_fts) VALUES ('rebuild');
+"""
+
+
+def is_database(path):
+    return path.lower().endswith(DATABASE_SUFFIXES)
+
+
+# Write `entries` as a new database at db_path, replacing any old one once
+# it is complete
+def import_entries(db_path, entries, sources=()):
+    store = EntryStore(entries)
+    tmp_path = db_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                         [('version', str(SCHEMA_VERSION)), ('entries', str(len(entries))),
+                          ('sources', '\n'.join(sources))])
+        conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?)",
+                         ((row, *entry) for row, entry in enumerate(entries)))
+        # Rows are listed in order, so the first row of a key is its smallest
+        conn.executemany("INSERT OR IGNORE INTO keys VALUES (?, ?, ?)",
+                         ((table, key, row) for table, keys in build_term_index(store).tables().items()
+                          for key, rows in keys.items() for row in rows))
+        term_id = 0
+        for col in ('English', 'Eald-vacha'):
+            ids, postings = {}, []
+            for row, cell in enumerate(store[col]):
+                if cell is None:
+                    continue
+                for term in cell_terms(cell):
+                    if term not in ids:
+                        ids[term] = term_id
+                        term_id += 1
+                    postings.append((ids[term], row))
+            conn.executemany("INSERT INTO terms VALUES (?, ?, ?, ?)",
+                             ((tid, col, term, term[::-1]) for term, tid in ids.items()))
+            conn.executemany("INSERT INTO term_rows VALUES (?, ?)", postings)
+        conn.executemany("INSERT INTO roots VALUES (?)", ((root,) for root in build_roots(store)))
+        conn.executescript(INDEXES)
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+
+
+# Merge the spreadsheets, in order, into a database at db_path
+def import_lexicon(db_path, spreadsheets):
+    entries = []
+    for path in spreadsheets:
+        entries.extend(load_snapshot(path).entries)
+    import_entries(db_path, entries, spreadsheets)
+    return len(entries)
+
+
+# One read-only connection per thread, as the server queries from several
+class Connections:
+    def __init__(self, db_path):
+        self.uri = f"file:{os.path.abspath(db_path)}?mode=ro"
+        self.local = threading.local()
+
+    def get(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = sqlite3.connect(self.uri, uri=True)
+        return conn
+
+    def value(self, sql, args=()):
+        row = self.get().execute(sql, args).fetchone()
+        return None if row is None else row[0]
+
+    def values(self, sql, args=()):
+        return [row[0] for row in self.get().execute(sql, args)]
+
+
+# One column of the entries, indexed by row like an EntryStore column
+class SqliteColumn:
+    def __init__(self, db, column, count):
+        self.db = db
+        self.field = FIELDS[column]
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, row):
+        return self.db.value(f"SELECT {self.field} FROM entries WHERE row = ?", (row,))
+
+    def __iter__(self):
+        for (cell,) in self.db.get().execute(f"SELECT {self.field} FROM entries ORDER BY row"):
+            yield cell
+
+
+# The entries in the database, implementing the store protocol (entry_store.py)
+class SqliteStore:
+    def __init__(self, db):
+        count = int(db.value("SELECT value FROM meta WHERE key = 'entries'"))
+        self.columns = {name: SqliteColumn(db, name, count) for name in COLUMNS}
+        self.count = count
+        self.split = {}
+
+    # CellTerms of one column, read from the database on first use
+    def terms(self, column):
+        terms = self.split.get(column)
+        if terms is None:
+            terms = self.split[column] = CellTerms(list(self.columns[column]))
+        return terms
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+
+# TermIndex lookups on the keys table
+class SqliteTermIndex:
+    def __init__(self, db):
+        self.db = db
+
+    def find_exact(self, term_lower):
+        return self.db.value("SELECT min(row) FROM keys WHERE tbl = 'eald' AND key = ?", (term_lower,))
+
+    def find_alternate(self, term_lower):
+        return self.db.value("SELECT min(row) FROM keys WHERE tbl = 'alt' AND key = ?", (term_lower,))
+
+    def find_term(self, term_lower):
+        return self.db.value("SELECT min(row) FROM keys WHERE tbl IN ('alt', 'part') AND key = ?",
+                             (term_lower,))
+
+
+# WildcardIndex lookups for one column on the terms tables; term ids are
+# the ids of the terms table
+class SqliteWildcard:
+    def __init__(self, db, column):
+        self.db = db
+        self.column = column
+
+    def exact(self, s):
+        return self.db.values("SELECT id FROM terms WHERE col = ? AND term = ?", (self.column, s))
+
+    def prefix(self, s):
+        return self.db.values("SELECT id FROM terms WHERE col = ? AND term >= ? AND term < ?",
+                              (self.column, s, s + MAX_CHAR))
+
+    def suffix(self, s):
+        s = s[::-1]
+        return self.db.values("SELECT id FROM terms WHERE col = ? AND reversed >= ? AND reversed < ?",
+                              (self.column, s, s + MAX_CHAR))
+
+    def infix(self, s):
+        if len(s) < GRAM:
+            # Too short for trigrams; such patterns match most of the column anyway
+            return self.db.values("SELECT id FROM terms WHERE col = ? AND instr(term, ?) > 0",
+                                  (self.column, s))
+        phrase = '"' + s.replace('"', '""') + '"'
+        # '+col' keeps the planner on the matched ids instead of scanning the column
+        return self.db.values("SELECT id FROM terms WHERE id IN "
+                              "(SELECT rowid FROM terms_fts WHERE terms_fts MATCH ?) AND +col = ?",
+                              (phrase, self.column))
+
+    # Rows (in dictionary order) of the given terms, skipping terms that
+    # contain any of the excluded substrings
+    def rows(self, term_ids, exclude=()):
+        rows = set()
+        for i in range(0, len(term_ids), CHUNK):
+            chunk = term_ids[i:i + CHUNK]
+            marks = ','.join('?' * len(chunk))
+            if exclude:
+                chunk = [tid for tid, term in self.db.get().execute(
+                    f"SELECT id, term FROM terms WHERE id IN ({marks})", chunk)
+                    if not any(excl in term for excl in exclude)]
+                marks = ','.join('?' * len(chunk))
+            rows.update(self.db.values(f"SELECT row FROM term_rows WHERE term IN ({marks})", chunk))
+        return sorted(rows)
+
+
+# The root set, as a container SegmentationDAG probes substring by substring
+class SqliteRoots:
+    def __init__(self, db):
+        self.db = db
+
+    def __contains__(self, root):
+        return self.db.value("SELECT 1 FROM roots WHERE root = ?", (root,)) is not None
+
+    def __iter__(self):
+        return iter(self.db.values("SELECT root FROM roots"))
+
+
+# Dictionary over a database written by import_lexicon()
+class SqliteDictionary(Dictionary):
+    def __init__(self, db_path, cache_size=DEFAULT_CACHE_SIZE):
+        db = self.db = Connections(db_path)
+        version = db.value("SELECT value FROM meta WHERE key = 'version'")
+        if version != str(SCHEMA_VERSION):
+            raise ValueError(f"{db_path} is not a lexicon database of version {SCHEMA_VERSION}; re-run the import")
+        with instrument.stage('index.store'):
+            self.store = SqliteStore(db)
+        self.roots = SqliteRoots(db)
+        self.index = SqliteTermIndex(db)
+        self.wildcard = {col: SqliteWildcard(db, col) for col in ('English', 'Eald-vacha')}
+        self._fuzzy = None
+        self._fulltext = None
+        self.decompositions = None
+        self.pending = {}
+        self.cache = QueryCache(cache_size)
+        self.source = None
+        self.watcher = None
+        # Not held: the entries stay in the database, which is rebuilt by
+        # import_lexicon() rather than reloaded, and has no suggestions
+        self.entries = None
+        self.usage = None
+        self.completers = {}
+
+    @classmethod
+    def load(cls, file_path, decompositions=True, cache_size=DEFAULT_CACHE_SIZE):
+        with instrument.stage('load'):
+            return cls(file_path, cache_size)
+
+    @property
+    def fuzzy(self):
+        if self._fuzzy is None:
+            with instrument.stage('index.fuzzy'):
+                self._fuzzy = build_fuzzy_index(self.store)
+        return self._fuzzy
+
+    @property
+    def fulltext(self):
+        if self._fulltext is None:
+            with instrument.stage('index.fulltext'):
+                self._fulltext = build_fulltext_index(self.store)
+        return self._fulltext
+
+    # Suggestions need the in-memory term arrays, so a database offers none
+    def suggest(self, prefix, direction):
+        return []
+
+    def apply_entries(self, entries, stamp=None):
+        raise ValueError("a lexicon database is not updated in place; re-run the import")
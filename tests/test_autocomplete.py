@@ -0,0 +1,22 @@
+from autocomplete import Completer
+from wildcard import WildcardIndex
+
+CELLS = ['walk', 'Walk away', 'walker / walking', 'walk away', 'wall', None, 'to walk']
+
+
+def completer():
+    return Completer(WildcardIndex(CELLS))
+
+
+def test_prefix_is_case_insensitive_and_ranked_by_use():
+    assert completer().suggest('WAL') == ['walk away', 'walk', 'walker', 'walking', 'wall']
+
+
+def test_trailing_space_is_part_of_the_prefix():
+    c = completer()
+    assert c.suggest('walk ') == ['walk away']
+    assert c.suggest('  walk ') == ['walk away']
+
+
+def test_blank_prefix_suggests_nothing():
+    assert completer().suggest('   ') == []
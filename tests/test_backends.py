@@ -0,0 +1,68 @@
+# The in-memory and SQLite backends must answer every query the same way
+import os
+
+import pytest
+
+from dictionary_core import EN_TO_EV, EV_TO_EN, Dictionary, build_roots, build_term_index, load_snapshot
+from entry_store import EntryStore
+from snapshot import Snapshot
+from sqlite_backend import SqliteDictionary, import_entries
+
+XLSX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dictionary.xlsx')
+
+SEARCHES = [
+    # exact
+    ('wodar', EV_TO_EN), ('Water', EN_TO_EV), ('halak', EV_TO_EN), ('walk', EN_TO_EV),
+    # prefix, suffix, infix
+    ('wod*', EV_TO_EN), ('hal*', EV_TO_EN), ('walk*', EN_TO_EV), ('*ar', EV_TO_EN), ('*ing', EN_TO_EV),
+    ('*ala*', EV_TO_EN), ('*ate*', EN_TO_EV), ('*an*', EV_TO_EN), ('*a*', EN_TO_EV), ('*', EV_TO_EN),
+    ('**', EN_TO_EV),
+    # the habban/amabba exclusion
+    ('*abba*', EV_TO_EN), ('*abb*', EV_TO_EN), ('*habban*', EV_TO_EN), ('abba*', EV_TO_EN), ('*abba', EV_TO_EN),
+    # fuzzy fallback
+    ('halax', EV_TO_EN), ('wodra', EV_TO_EN), ('Yellox', EN_TO_EV), ('watr', EN_TO_EV), ('zzzzqq', EN_TO_EV),
+]
+KEYWORDS = ['water', 'walking', 'walk fast', 'machines', 'guide', 'nothing-matches-this']
+WORDS = ['dalilyantra', 'nəgrah', 'wodarhalak', 'qwxz']
+
+
+@pytest.fixture(scope='module')
+def backends(tmp_path_factory):
+    entries = load_snapshot(XLSX).entries
+    store = EntryStore(entries)
+    memory = Dictionary(Snapshot(entries, build_roots(store), build_term_index(store).tables()))
+    path = str(tmp_path_factory.mktemp('lexicon') / 'lexicon.sqlite')
+    import_entries(path, entries)
+    return memory, SqliteDictionary(path)
+
+
+def both(backends, query):
+    return [query(dictionary) for dictionary in backends]
+
+
+@pytest.mark.parametrize('query, direction', SEARCHES)
+def test_searches_match(backends, query, direction):
+    def search(dictionary):
+        results, is_fuzzy = dictionary.search_results(query, direction)
+        return results.format(), is_fuzzy, results.translations()
+    memory, sqlite = both(backends, search)
+    assert memory == sqlite
+
+
+def test_fuzzy_fallback_is_used(backends):
+    for dictionary in backends:
+        results, is_fuzzy = dictionary.search_results('halax', EV_TO_EN)
+        assert is_fuzzy and len(results)
+
+
+@pytest.mark.parametrize('query', KEYWORDS)
+def test_fulltext_matches(backends, query):
+    memory, sqlite = both(backends, lambda dictionary: dictionary.fulltext_results(query).format())
+    assert memory == sqlite
+
+
+@pytest.mark.parametrize('word', WORDS)
+def test_decompose_and_gloss_match(backends, word):
+    memory, sqlite = both(backends, lambda dictionary: (dictionary.decompose(word), dictionary.gloss(word),
+                                                        dictionary.meaning(word)))
+    assert memory == sqlite
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+import instrument
+from dictionary_core import EV_TO_EN, Dictionary
+
+XLSX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dictionary.xlsx')
+
+
+@pytest.fixture(scope='module')
+def dictionary():
+    return Dictionary.load(XLSX, decompositions=False)
+
+
+# Each cached query counts a miss, then hits returning the same result
+@pytest.mark.parametrize('query', [
+    lambda d: d.search_results('wodar', EV_TO_EN),
+    lambda d: d.search_results('halax', EV_TO_EN),
+    lambda d: d.fulltext_results('water'),
+    lambda d: d.decompose('dalilyantra'),
+    lambda d: d.gloss('nəgrah'),
+])
+def test_queries_are_cached(dictionary, query):
+    dictionary.cache.clear()
+    with instrument.recording() as recorder:
+        first = query(dictionary)
+        assert query(dictionary) is first
+        assert query(dictionary) is first
+    assert recorder.counters['cache.misses'] == 1
+    assert recorder.counters['cache.hits'] == 2
+
+
+def test_abandoned_search_is_not_cached(dictionary):
+    dictionary.cache.clear()
+
+    def check():
+        raise KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        dictionary.search_results('halax', EV_TO_EN, check=check)
+    assert len(dictionary.cache) == 0
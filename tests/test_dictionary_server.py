@@ -0,0 +1,220 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+from dictionary_core import Dictionary, build_roots, build_term_index
+from dictionary_server import DictionaryServer
+from entry_store import EntryStore
+from snapshot import Snapshot
+
+
+class FakeDictionary:
+    def __init__(self):
+        self.applied = []
+
+    def read_changes(self):
+        return ('entries',) if not self.applied else None
+
+    def apply_entries(self, entries):
+        self.applied.append((entries, threading.current_thread() is threading.main_thread()))
+        return SimpleNamespace(added=[0], removed=[])
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_reload_runs_off_the_event_loop():
+    async def main():
+        dictionary = FakeDictionary()
+        server = DictionaryServer(dictionary)
+        server.start_watch(0.001)
+        while not dictionary.applied:
+            await asyncio.sleep(0.001)
+        server.watcher.cancel()
+        assert server.heavy._value == server.max_heavy and server.ready.is_set()
+        return dictionary.applied
+
+    assert run(main()) == [('entries', False)]
+
+
+def test_failed_watcher_is_restarted():
+    async def main():
+        server = DictionaryServer(FakeDictionary())
+        calls = []
+
+        async def watch(interval):
+            calls.append(interval)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            await asyncio.sleep(3600)
+
+        server.watch = watch
+        server.start_watch(0.5)
+        first = server.watcher
+        while len(calls) < 2:
+            await asyncio.sleep(0.001)
+        assert server.watcher is not first and not server.watcher.done()
+        server.watcher.cancel()
+        await asyncio.sleep(0)
+        return calls
+
+    assert run(main()) == [0.5, 0.5]
+
+
+ENTRIES = [
+    ('Water', 'wodar', None),
+    ('Walk', 'halak', 'Verb'),
+    ('Water-walk', 'wodar-halak', None),
+    (None, 'kelo', None),
+    ('Machine', 'yantra', None),
+]
+
+
+def small_dictionary(cls=Dictionary):
+    store = EntryStore(ENTRIES)
+    return cls(Snapshot(ENTRIES, build_roots(store), build_term_index(store).tables()))
+
+
+class Writer:
+    def __init__(self):
+        self.data = bytearray()
+        self.closed = asyncio.Event()
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed.set()
+
+
+def request(method, target, body=b'', close=False):
+    headers = f"Content-Length: {len(body)}\r\n" if body else ''
+    if close:
+        headers += 'Connection: close\r\n'
+    return f"{method} {target} HTTP/1.1\r\nHost: test\r\n{headers}\r\n".encode('latin-1') + body
+
+
+# [(status, payload), ...] of the responses written, in order
+def responses(data):
+    found = []
+    while data:
+        head, _, data = bytes(data).partition(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        length = next(int(line.split(':')[1]) for line in lines if line.lower().startswith('content-length'))
+        found.append((int(lines[0].split()[1]), json.loads(data[:length])))
+        data = data[length:]
+    return found
+
+
+# Feed raw requests into handle_connection and collect its responses
+async def exchange(server, data):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    writer = Writer()
+    await server.handle_connection(reader, writer)
+    await writer.closed.wait()
+    return responses(writer.data)
+
+
+def test_endpoints():
+    server = DictionaryServer(small_dictionary())
+    data = b''.join([
+        request('GET', '/search?q=wodar&direction=ev'),
+        request('GET', '/search?q=wodra&direction=ev'),
+        request('POST', '/fuzzy', json.dumps({'q': 'Watr', 'direction': 'en', 'limit': 1}).encode()),
+        request('GET', '/fulltext?q=walk'),
+        request('GET', '/meaning?term=halak'),
+        request('GET', '/meaning?term=kelo'),
+        request('GET', '/decompose?word=wodarhalak'),
+        request('GET', '/compounds?root=wodar'),
+        request('GET', '/health', close=True),
+    ])
+    found = run(exchange(server, data))
+    assert [status for status, _ in found] == [200] * 9
+    search, fuzzy_search, fuzzy, fulltext, meaning, blank, decompose, compounds, health = [p for _, p in found]
+    assert (search['match'], search['total']) == ('exact', 1) and 'English: Water' in search['results'][0]
+    assert fuzzy_search['match'] == 'fuzzy' and 'wodar' in fuzzy_search['results'][0]
+    assert len(fuzzy['results']) == 1 and 'Water' in fuzzy['results'][0]
+    assert fulltext['total'] == 2
+    assert meaning == {'term': 'halak', 'meaning': 'Walk'}
+    assert blank == {'term': 'kelo', 'meaning': None}
+    assert 'wodar' in decompose['decomposition'] and 'halak' in decompose['decomposition']
+    assert [c['word'] for c in compounds['compounds']] == ['wodar-halak']
+    assert health['status'] == 'ok' and health['entries'] == len(ENTRIES)
+
+
+def test_error_statuses():
+    server = DictionaryServer(small_dictionary())
+    data = b''.join([
+        request('GET', '/nowhere'),
+        request('PUT', '/search?q=wodar'),
+        request('GET', '/search'),
+        request('GET', '/search?q=wodar&direction=xx'),
+        request('GET', '/search?q=wodar&limit=many'),
+        request('POST', '/search', b'[1, 2]'),
+        request('POST', '/search', b'{not json'),
+        request('GET', '/meaning?term=zzzz'),
+        b'NONSENSE\r\n\r\n',
+    ])
+    found = run(exchange(server, data))
+    assert [status for status, _ in found] == [404, 405, 400, 400, 400, 400, 400, 404, 400]
+    assert all('error' in payload for _, payload in found)
+
+
+# A slow decomposition ahead of a quick lookup on the same connection: the
+# lookup is answered first but its response is sent second
+def test_pipelined_responses_keep_request_order():
+    order = []
+    looked_up = threading.Event()
+
+    class Slow(Dictionary):
+        def decompose(self, word):
+            assert looked_up.wait(5)
+            order.append('decompose')
+            return super().decompose(word)
+
+        def meaning(self, term):
+            order.append('meaning')
+            looked_up.set()
+            return super().meaning(term)
+
+    server = DictionaryServer(small_dictionary(Slow))
+    data = request('GET', '/decompose?word=wodarhalak') + request('GET', '/meaning?term=wodar', close=True)
+    found = run(exchange(server, data))
+    assert order == ['meaning', 'decompose']
+    assert [next(iter(payload)) for _, payload in found] == ['word', 'term']
+
+
+# While a reload updates the indexes, lookups wait for it to finish
+def test_reload_blocks_lookups():
+    applying, release = threading.Event(), threading.Event()
+
+    class Reloading(Dictionary):
+        def read_changes(self):
+            return None if release.is_set() else (ENTRIES[:2],)
+
+        def apply_entries(self, entries, stamp=None):
+            applying.set()
+            assert release.wait(5)
+            return super().apply_entries(entries, stamp)
+
+    async def main():
+        server = DictionaryServer(small_dictionary(Reloading))
+        server.start_watch(0.001)
+        while not applying.is_set():
+            await asyncio.sleep(0.001)
+        lookup = asyncio.create_task(exchange(server, request('GET', '/health', close=True)))
+        await asyncio.sleep(0.05)
+        assert not lookup.done()
+        release.set()
+        found = await lookup
+        server.watcher.cancel()
+        return found
+
+    assert run(main()) == [(200, {'status': 'ok', 'entries': 2, 'cache': {'size': 0, 'hits': 0, 'misses': 0}})]
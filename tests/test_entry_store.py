@@ -0,0 +1,73 @@
+import pytest
+
+from dictionary_core import build_fuzzy_index, build_roots, build_term_index, build_wildcard_index, cell_roots, root_usage
+from entry_store import COLUMNS, CellTerms, EntryStore
+from fuzzy import FuzzyIndex
+from sqlite_backend import Connections, SqliteStore, import_entries
+from wildcard import WildcardIndex
+
+ENTRIES = [
+    ('Walk', 'halak', None),
+    ('Walk in Front Of/Lead', 'halak-jelo', 'note'),
+    ('Water', ' Wodar / wodar-ka ', None),
+    ('Lead', None, 'note'),
+    ('Empty alternate', 'kala/', None),
+    ('Walk', 'Halak', None),
+]
+
+
+# Every implementer of the store protocol, holding ENTRIES
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return EntryStore(ENTRIES)
+    path = str(tmp_path / 'lexicon.sqlite')
+    import_entries(path, ENTRIES)
+    return SqliteStore(Connections(path))
+
+
+def test_store_protocol(store):
+    assert len(store) == len(ENTRIES)
+    for i, column in enumerate(COLUMNS):
+        cells = [entry[i] for entry in ENTRIES]
+        assert list(store[column]) == cells
+        assert [store[column][row] for row in range(len(ENTRIES))] == cells
+        terms = store.terms(column)
+        assert store.terms(column) is terms
+        expected = CellTerms(cells)
+        for row in range(len(ENTRIES)):
+            assert terms.row(row) == expected.row(row)
+        assert terms.split == expected.split
+
+
+def test_repeated_cells_are_held_once():
+    store = EntryStore(ENTRIES + [(''.join(['Wa', 'lk']), 'x', None)])
+    assert store['English'][0] is store['English'][-1] is store['English'][5]
+    assert store['Notes'][1] is store['Notes'][3]
+
+
+def test_split_terms_match_splitting_each_cell(store):
+    expected = {}
+    for cell in store['Eald-vacha']:
+        for root in cell_roots(cell):
+            expected[root] = expected.get(root, 0) + 1
+    assert build_roots(store) == set(expected)
+    assert root_usage(store) == expected
+    for col in ('English', 'Eald-vacha'):
+        built = build_wildcard_index(store, (col,))[col]
+        assert built.term_ids == WildcardIndex(store[col]).term_ids
+        assert built.term_rows == WildcardIndex(store[col]).term_rows
+        fuzzy, split_again = build_fuzzy_index(store, (col,))[col], FuzzyIndex(store[col])
+        assert dict(zip(fuzzy.terms, fuzzy.uses)) == dict(zip(split_again.terms, split_again.uses))
+
+
+def test_indexes_share_the_normalized_terms():
+    store = EntryStore(ENTRIES)
+    index = build_term_index(store)
+    wildcard = build_wildcard_index(store)['Eald-vacha']
+    fuzzy = build_fuzzy_index(store)['Eald-vacha']
+    for key in index.alternates:
+        assert wildcard.terms[wildcard.term_ids[key]] is key
+        assert next(t for t in fuzzy.terms if t == key) is key
+    # A lowercase cell is its own key
+    assert next(k for k in index.exact if k == 'halak') is store['Eald-vacha'][0]
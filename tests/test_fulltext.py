@@ -0,0 +1,32 @@
+import pytest
+
+from fulltext import FullTextIndex, stem
+
+# Inflected forms and the base they must share a stem with
+SAME_STEM = [
+    ('use', 'using'), ('use', 'used'), ('use', 'uses'),
+    ('speed', 'speeding'), ('speed', 'speeds'), ('bleed', 'bleeding'),
+    ('proceed', 'proceeding'), ('succeed', 'succeeded'),
+    ('agree', 'agreed'), ('agree', 'agreeing'), ('agree', 'agreement'),
+    ('free', 'freed'), ('need', 'needed'),
+    ('hope', 'hoped'), ('hope', 'hoping'), ('hop', 'hopping'),
+    ('walk', 'walks'), ('walk', 'walking'), ('walk', 'walked'),
+    ('comment', 'commenting'), ('commit', 'committed'), ('commit', 'commitment'),
+    ('fly', 'flies'), ('age', 'aged'), ('ice', 'icing'), ('fall', 'falling'),
+]
+
+
+@pytest.mark.parametrize('base, inflected', SAME_STEM)
+def test_inflected_forms_share_the_base_stem(base, inflected):
+    assert stem(inflected) == stem(base)
+
+
+@pytest.mark.parametrize('a, b', [('use', 'us'), ('thing', 'the'), ('sing', 's')])
+def test_distinct_words_keep_distinct_stems(a, b):
+    assert stem(a) != stem(b)
+
+
+@pytest.mark.parametrize('query', ['using', 'speeding', 'agree', 'agreed'])
+def test_inflected_query_finds_the_base_entry(query):
+    index = FullTextIndex(['Use', 'Speed', 'Agreement/Contract', 'We/Us'], [None] * 4)
+    assert len(index.search(query, 10)) == 1
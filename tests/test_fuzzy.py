@@ -0,0 +1,93 @@
+import difflib
+import itertools
+import random
+
+import pytest
+
+import similarity
+from entry_store import EntryStore
+from fuzzy import FuzzyIndex
+
+ALPHABET = 'aaeeioundrstlkə'
+
+
+def random_word(rng):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.choice([2, 4, 6, 9, 14, 30, 260])))
+
+
+def mutate(rng, word):
+    s = list(word)
+    for _ in range(rng.randint(0, 3)):
+        op = rng.randrange(3)
+        if op == 0 and s:
+            s[rng.randrange(len(s))] = rng.choice(ALPHABET)
+        elif op == 1:
+            s.insert(rng.randint(0, len(s)), rng.choice(ALPHABET))
+        elif s:
+            del s[rng.randrange(len(s))]
+    return ''.join(s)
+
+
+# Cells of one or more '/'-alternates, many of them near copies of a few
+# stems, with repeated terms and cells, mixed case and blank cells
+def random_cells(rng, count):
+    stems = [random_word(rng) for _ in range(40)]
+    cells = []
+    for _ in range(count):
+        if rng.random() < 0.05:
+            cells.append(None)
+            continue
+        if cells and rng.random() < 0.1:
+            cells.append(rng.choice(cells))
+            continue
+        terms = [mutate(rng, rng.choice(stems)) or 'a' for _ in range(rng.choice([1, 1, 2, 3]))]
+        cells.append(' / '.join(t.upper() if rng.random() < 0.1 else t for t in terms))
+    return cells, stems
+
+
+# The original fuzzy search: score every term of every row, keep the first
+# candidate in (score descending, row, position) order of each cell. It
+# skipped repeats by id() of the cell, which openpyxl shares between cells
+# of the same text, so rows with identical cells count once.
+def linear_scan(cells, query, min_score):
+    candidates = []
+    for row, cell in enumerate(cells):
+        if cell is None:
+            continue
+        for term in (t.strip() for t in cell.split('/')):
+            score = difflib.SequenceMatcher(None, query, term.lower()).ratio() * 100
+            if score >= min_score:
+                candidates.append((score, row, term, cell))
+    candidates.sort(key=lambda c: c[0], reverse=True)
+    seen, results = set(), []
+    for score, row, term, cell in candidates:
+        if cell not in seen:
+            seen.add(cell)
+            results.append((score, row, term))
+    return results
+
+
+@pytest.mark.parametrize('min_score', [50, 75, 90])
+@pytest.mark.parametrize('seed', range(3))
+def test_search_matches_linear_scan(monkeypatch, min_score, seed):
+    rng = random.Random(seed)
+    cells, stems = random_cells(rng, 400)
+    store = EntryStore([(cell, None, None) for cell in cells])
+    indexes = [FuzzyIndex(cells), FuzzyIndex(store['English'], store.terms('English'))]
+    queries = [mutate(rng, rng.choice(stems)) for _ in range(12)] + [random_word(rng) for _ in range(4)]
+    for query in queries:
+        expected = linear_scan(cells, query, min_score)
+        # Batches scored with NumPy, then one by one with difflib
+        for min_batch in (1, len(cells)):
+            monkeypatch.setattr(similarity, 'MIN_BATCH', min_batch)
+            for limit, index in itertools.product((1, 4, 50), indexes):
+                assert index.search(query, min_score, limit) == expected[:limit], query
+
+
+# Identical entries, as 'Yellow' on three rows of the real dictionary, are
+# listed once and leave room for other matches
+def test_identical_cells_are_listed_once():
+    cells = ['Yellow', 'Yellow', 'Yellow', 'Yell', 'Mellow', 'Fellow/Yellow', 'Hello']
+    store = EntryStore([(cell, None, None) for cell in cells])
+    for index in (FuzzyIndex(cells), FuzzyIndex(store['English'], store.terms('English'))):
+        assert [row for _, row, _ in index.search('yellox', 60, 4)] == [0, 5, 3, 6]
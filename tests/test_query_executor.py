@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from query_executor import QueryExecutor
+
+
+# Stands in for the Tk root: after() only records the callback
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    # Run the latest scheduled poll until `done()` or a timeout
+    def poll_until(self, done):
+        deadline = time.monotonic() + 5
+        while not done() and time.monotonic() < deadline:
+            poll = self.scheduled.pop()
+            try:
+                poll()
+            finally:
+                time.sleep(0.005)
+
+
+def test_polling_continues_after_a_callback_raises():
+    root = FakeRoot()
+    executor = QueryExecutor(root)
+    results = []
+
+    def broken(result):
+        raise RuntimeError('callback failed')
+
+    executor.submit(lambda job: 1, broken)
+    with pytest.raises(RuntimeError):
+        root.poll_until(lambda: False)
+    assert root.scheduled, "the poll was not rescheduled"
+    executor.submit(lambda job: 2, results.append)
+    root.poll_until(lambda: results)
+    assert results == [2]
+
+
+def test_only_query_jobs_are_profiled():
+    root = FakeRoot()
+    profiled = []
+    executor = QueryExecutor(root, on_profile=profiled.append)
+    done = []
+    executor.submit(lambda job: 'reload', done.append, profile=False)
+    root.poll_until(lambda: done)
+    query = executor.submit(lambda job: 'query', done.append)
+    root.poll_until(lambda: len(done) == 2)
+    assert done == ['reload', 'query']
+    assert profiled == [query]
+    assert query.profile is not None
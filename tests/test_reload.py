@@ -0,0 +1,75 @@
+# A dictionary updated by apply_entries() must match one built from scratch
+import os
+import random
+
+import pytest
+
+from dictionary_core import (EN_TO_EV, EV_TO_EN, Dictionary, build_roots, build_term_index, load_snapshot,
+                             root_usage)
+from entry_store import EntryStore
+from snapshot import Snapshot
+
+XLSX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dictionary.xlsx')
+
+
+@pytest.fixture(scope='module')
+def real():
+    return [entry for entry in load_snapshot(XLSX).entries if entry[1] is not None][:400]
+
+
+def fresh(entries):
+    store = EntryStore(entries)
+    return Dictionary(Snapshot(entries, build_roots(store), build_term_index(store).tables()))
+
+
+# A few random edits, including adding and removing rows with a blank
+# Eald-vacha cell
+def mutate(entries, rng):
+    entries = list(entries)
+    words = [v for _, v, _ in entries if v] or ['kala']
+    for _ in range(rng.randint(1, 5)):
+        op = rng.choice(['edit', 'insert', 'delete', 'notes', 'blank', 'unblank'])
+        i = rng.randrange(len(entries))
+        english, word, notes = entries[i]
+        if op == 'edit':
+            entries[i] = (english, rng.choice(words) + '-' + rng.choice(words).split('/')[0], notes)
+        elif op == 'insert':
+            entries.insert(i, (rng.choice(entries)[0], rng.choice(words)[:4] + 'ka', None))
+        elif op == 'delete' and len(entries) > 1:
+            del entries[i]
+        elif op == 'notes':
+            entries[i] = (english, word, 'changed note')
+        elif op == 'blank':
+            entries.insert(i, (rng.choice(entries)[0], None, None))
+        elif op == 'unblank':
+            blanks = [j for j, entry in enumerate(entries) if entry[1] is None]
+            if blanks:
+                del entries[rng.choice(blanks)]
+    return entries
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_reload_matches_a_fresh_build(real, seed):
+    rng = random.Random(seed)
+    entries = real
+    live = fresh(entries)
+    for _ in range(8):
+        entries = mutate(entries, rng)
+        live.apply_entries(entries)
+        ref = fresh(entries)
+        assert live.store.columns == ref.store.columns
+        assert live.index.tables() == ref.index.tables()
+        assert set(live.roots) == build_roots(ref.store)
+        assert {root: n for root, n in live.usage.items() if n} == root_usage(ref.store)
+        assert live.fulltext.postings == ref.fulltext.postings
+        for col in live.fuzzy:
+            # Terms of equal length may be in another order; search doesn't depend on it
+            assert dict(zip(live.fuzzy[col].terms, live.fuzzy[col].uses)) == \
+                dict(zip(ref.fuzzy[col].terms, ref.fuzzy[col].uses))
+        for word in rng.sample([v for _, v, _ in entries if v], 20):
+            assert live.search_results(word, EV_TO_EN)[0].format() == ref.search_results(word, EV_TO_EN)[0].format()
+            assert live.decompose(word) == ref.decompose(word)
+            assert live.suggest(word[:2], EV_TO_EN) == ref.suggest(word[:2], EV_TO_EN)
+        for english in rng.sample([e for e, _, _ in entries if e], 10):
+            assert live.search_results(english, EN_TO_EV)[0].format() == \
+                ref.search_results(english, EN_TO_EV)[0].format()
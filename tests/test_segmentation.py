@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+import instrument
+from dictionary_core import (MAX_CANDIDATES, build_roots, build_term_index, find_possible_decompositions,
+                             get_meaning, rank_decompositions, score_segmentation)
+from entry_store import EntryStore
+from segmentation import RootTrie
+
+ALPHABET = 'ak'
+GLOSSES = ['water', 'walk', 'guide', 'machine', 'light', 'lead', 'get', 'take', 'fire', 'earth']
+
+
+# Every segmentation of word_lower[start:] into roots of 3+ letters, with at
+# least two parts, as the original recursive search found them
+def all_segmentations(word_lower, roots, start=0, path=None):
+    if path is None:
+        path = []
+    if start == len(word_lower):
+        return [path[:]] if len(path) >= 2 else []
+    segmentations = []
+    for end in range(start + 3, len(word_lower) + 1):
+        if word_lower[start:end] in roots:
+            path.append((start, end, word_lower[start:end]))
+            segmentations.extend(all_segmentations(word_lower, roots, end, path))
+            path.pop()
+    return segmentations
+
+
+# The original ranking: score every segmentation, keep those above 25, best
+# three by (score, label)
+def exhaustive(word, store, roots, index):
+    word_lower = word.lower()
+    row = index.find_exact(word_lower)
+    actual_eng = store['English'][row] if row is not None else ""
+    scored = []
+    for seg in all_segmentations(word_lower, roots):
+        score = score_segmentation(seg, word_lower, store, actual_eng, index)
+        if score > 25:
+            scored.append((score, " + ".join(f"{p}: {get_meaning(p, store, index)}" for _, _, p in seg)))
+    scored.sort(reverse=True)
+    return scored[:3]
+
+
+def random_lexicon(rng):
+    roots = sorted({''.join(rng.choice(ALPHABET) for _ in range(rng.randint(3, 4))) for _ in range(14)})
+    entries = [(rng.choice(GLOSSES) + rng.choice(['', '/' + rng.choice(GLOSSES)]), root, None) for root in roots]
+    words = [''.join(rng.choice(roots) for _ in range(rng.randint(2, 8))) for _ in range(30)]
+    # Compounds with a definition of their own, which the composed meanings
+    # are compared with
+    entries += [(' '.join(rng.sample(GLOSSES, 2)), word, None) for word in words[:15]]
+    return entries, words
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_ranking_matches_exhaustive_search(seed):
+    rng = random.Random(seed)
+    entries, words = random_lexicon(rng)
+    store = EntryStore(entries)
+    roots, index = build_roots(store), build_term_index(store)
+    trie = RootTrie(roots)
+    for word in words:
+        ranked, truncated = rank_decompositions(word, store, trie, index)
+        expected = exhaustive(word, store, roots, index)
+        if ranked is None:
+            assert not all_segmentations(word.lower(), roots)
+            continue
+        assert not truncated
+        assert [item[:2] for item in ranked] == expected, word
+
+
+# A word with very many segmentations, none scoring well against its long
+# definition, so the bounds prune little
+def long_word_lexicon():
+    entries = [('x', 'aaa', None), ('y', 'aaaa', None), ('z', 'aaaaa', None), ('q' * 300, 'a' * 45, None)]
+    store = EntryStore(entries)
+    return store, RootTrie(build_roots(store)), build_term_index(store)
+
+
+def test_candidate_cap_sets_the_truncation_flag():
+    store, roots, index = long_word_lexicon()
+    with instrument.recording() as recorder:
+        ranked, truncated = rank_decompositions('a' * 45, store, roots, index, max_candidates=500)
+    assert truncated and len(ranked) == 3
+    assert recorder.counters['segmentation.scored'] == 500
+    assert recorder.counters['segmentation.truncated'] == 1
+    _, truncated = rank_decompositions('a' * 12, store, roots, index, max_candidates=500)
+    assert not truncated
+
+
+def test_truncation_is_reported():
+    store, roots, index = long_word_lexicon()
+    output = find_possible_decompositions('a' * 45, store, roots, index)
+    assert f"search stopped after {MAX_CANDIDATES} candidate segmentations" in output
+    assert "search stopped" not in find_possible_decompositions('a' * 12, store, roots, index)
@@ -0,0 +1,50 @@
+import difflib
+import random
+
+import pytest
+
+import similarity
+from similarity import Similarity
+
+ALPHABET = 'aaeeioundrstlkə -'
+
+
+def random_string(rng, length):
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+# Candidates of every length band, including empty ones and ones past
+# AUTOJUNK_MIN, plus near copies of the query
+def candidates(rng, query, count):
+    strings = [random_string(rng, rng.choice([0, 1, 3, 8, 15, 40, 120, 260, 400])) for _ in range(count)]
+    for _ in range(count // 4):
+        s = list(query)
+        for _ in range(rng.randint(0, 5)):
+            if s:
+                s[rng.randrange(len(s))] = rng.choice(ALPHABET)
+        strings.append(''.join(s))
+    return strings
+
+
+def difflib_ratios(query, strings):
+    return [difflib.SequenceMatcher(None, query, s).ratio() for s in strings]
+
+
+@pytest.mark.parametrize('min_batch', [1, similarity.MIN_BATCH])
+@pytest.mark.parametrize('query_length', [0, 1, 6, 25, 250, 320])
+def test_ratios_match_difflib(monkeypatch, min_batch, query_length):
+    monkeypatch.setattr(similarity, 'MIN_BATCH', min_batch)
+    rng = random.Random(query_length)
+    query = random_string(rng, query_length)
+    strings = candidates(rng, query, 160)
+    assert Similarity(query).ratios(strings).tolist() == difflib_ratios(query, strings)
+
+
+def test_query_is_reused_across_batches(monkeypatch):
+    monkeypatch.setattr(similarity, 'MIN_BATCH', 1)
+    rng = random.Random(7)
+    query = random_string(rng, 12)
+    scorer = Similarity(query)
+    for _ in range(3):
+        strings = candidates(rng, query, 50)
+        assert scorer.ratios(strings).tolist() == difflib_ratios(query, strings)
@@ -0,0 +1,33 @@
+import pytest
+
+from dictionary_core import EN_TO_EV, EV_TO_EN, open_dictionary
+from sqlite_backend import import_entries
+
+ENTRIES = [
+    ('Walk', 'halak', None),
+    ('Walk in Front Of/Lead', 'halak-jelo', 'note'),
+    ('Water', 'wodar', None),
+    ('Blank', None, None),
+]
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'lexicon.sqlite')
+    import_entries(path, ENTRIES)
+    return open_dictionary(path, decompositions=False)
+
+
+def test_searches_the_database(database):
+    assert database.search_results('halak', EV_TO_EN)[0].translations() == ['Walk']
+    assert database.search_results('water', EN_TO_EV)[0].translations() == ['wodar']
+
+
+def test_is_not_updated_in_place(database):
+    with pytest.raises(ValueError):
+        database.apply_entries(ENTRIES[:2])
+    assert database.reload() is None
+
+
+def test_offers_no_suggestions(database):
+    assert database.suggest('ha', EV_TO_EN) == []
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from dictionary_core import EN_TO_EV, EV_TO_EN, build_wildcard_index, match_exact_wildcard, search_columns
+from entry_store import EntryStore
+
+PIECES = ['a', 'b', 'ab', 'ba', 'abba', 'habban', 'amabba', 'an', 'n', 'ka', 'lo', 'ə', 'x']
+
+
+def random_term(rng):
+    term = ''.join(rng.choice(PIECES) for _ in range(rng.randint(1, 4)))
+    if rng.random() < 0.2:
+        term = term.upper() if rng.random() < 0.5 else term.capitalize()
+    if rng.random() < 0.2:
+        term = term[:2] + '-' + term[2:]
+    return term
+
+
+# Cells of one to three '/'-alternates with stray spaces, and blank cells
+def random_cell(rng):
+    if rng.random() < 0.1:
+        return None
+    return '/'.join(rng.choice(['', ' ']) + random_term(rng) + rng.choice(['', ' '])
+                    for _ in range(rng.choice([1, 1, 2, 3])))
+
+
+def random_pattern(rng, cells):
+    cell = rng.choice([c for c in cells if c])
+    term = rng.choice(cell.split('/')).strip()
+    s = term[rng.randrange(len(term) + 1):] if rng.random() < 0.5 else random_term(rng)
+    s = s[:rng.randint(0, len(s))] if rng.random() < 0.5 else s
+    return rng.choice(['{}', '{}*', '*{}', '*{}*', ' *{}* ', '* {} *']).format(s)
+
+
+# The original search: every term of every non-blank cell, in row order,
+# with the habban/amabba exclusion
+def linear_scan(cells, query):
+    q = query.strip().lower()
+    starts_star, ends_star = q.startswith('*'), q.endswith('*')
+    if starts_star and ends_star:
+        match_str = q[1:-1].strip()
+        match = lambda t: match_str in t  # noqa: E731
+    elif starts_star:
+        match_str = q[1:].strip()
+        match = lambda t: t.endswith(match_str)  # noqa: E731
+    elif ends_star:
+        match_str = q[:-1].strip()
+        match = lambda t: t.startswith(match_str)  # noqa: E731
+    else:
+        match_str = q.strip()
+        match = lambda t: t == match_str  # noqa: E731
+    exclude = ['habban', 'amabba']
+    apply_exclusion = (starts_star or ends_star) and 'abba' in match_str \
+        and not any(excl in match_str for excl in exclude)
+    rows = []
+    for row, cell in enumerate(cells):
+        if cell is None:
+            continue
+        for term in (t.strip().lower() for t in cell.split('/')):
+            if apply_exclusion and any(excl in term for excl in exclude):
+                continue
+            if match(term):
+                rows.append(row)
+                break
+    return rows
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_index_matches_linear_scan(seed):
+    rng = random.Random(seed)
+    entries = [(random_cell(rng), random_cell(rng), None) for _ in range(300)]
+    store = EntryStore(entries)
+    wildcard = build_wildcard_index(store)
+    patterns = [random_pattern(rng, store['English']) for _ in range(150)]
+    patterns += ['*', '**', '***', '*abba*', '*abb*', 'abba*', '*abba', '*habban*', '*amabba*', '*an*', '*a*', '*n*']
+    for direction in (EN_TO_EV, EV_TO_EN):
+        cells = store[search_columns(direction)[0]]
+        for pattern in patterns:
+            assert match_exact_wildcard(store, pattern, direction, wildcard) == linear_scan(cells, pattern), pattern
+
+
+# A blank cell has no terms, so no pattern matches it (it used to match
+# as the text 'nan')
+def test_blank_cells_never_match():
+    store = EntryStore([('Walk', 'halak', None), (None, None, None), ('Nan', 'nanak', None)])
+    wildcard = build_wildcard_index(store)
+    for pattern in ('*', '**', '*an*', '*a*', '*n*', 'nan', 'nan*', '*nan'):
+        for direction in (EN_TO_EV, EV_TO_EN):
+            assert 1 not in match_exact_wildcard(store, pattern, direction, wildcard)
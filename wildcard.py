@@ -0,0 +1,126 @@
+# Wildcard search engine for one dictionary column
+#
+# Every cell is split on '/' into terms (stripped, lowercased); each distinct
+# term is stored once with the rows it appears in. Lookups by pattern kind:
+#   exact   abc    dict lookup
+#   prefix  abc*   forward trie
+#   suffix  *abc   reversed trie (prefix search over reversed terms)
+#   infix   *abc*  trigram posting lists, verified by substring test
+# The tries are kept as sorted term arrays: a prefix's subtree is the
+# contiguous run found by bisection, which is far smaller in memory than
+# node objects and walks in time proportional to the number of matches.
+# update() applies a reload incrementally: terms that lose all their rows
+# stay in the arrays with no rows (they match nothing), so term ids are
+# stable and only genuinely new terms are inserted.
+from bisect import bisect_left, insort
+
+from entry_store import cell_alternates, normalize
+
+GRAM = 3
+
+
+class WildcardIndex:
+    # `terms`, the cells' CellTerms, saves splitting them again
+    def __init__(self, cells, terms=None):
+        self.term_ids = {}
+        self.terms = []
+        self.term_rows = []
+        for row, cell in enumerate(cells):
+            if cell is None:
+                continue
+            for term in cell_terms(cell) if terms is None else set(terms.row(row)[1]):
+                tid = self.term_ids.get(term)
+                if tid is None:
+                    tid = self.term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                    self.term_rows.append([])
+                self.term_rows[tid].append(row)
+
+        order = sorted(range(len(self.terms)), key=self.terms.__getitem__)
+        self.forward = [self.terms[t] for t in order]
+        self.forward_ids = order
+        order = sorted(range(len(self.terms)), key=lambda t: self.terms[t][::-1])
+        self.backward = [self.terms[t][::-1] for t in order]
+        self.backward_ids = order
+
+        self.grams = {}
+        for tid, term in enumerate(self.terms):
+            self._add_grams(tid, term)
+
+    def _add_grams(self, tid, term):
+        for gram in {term[i:i + GRAM] for i in range(len(term) - GRAM + 1)}:
+            self.grams.setdefault(gram, []).append(tid)
+
+    # Apply a reload (see dictionary_core.Dictionary._update_indexes); returns
+    # the terms whose rows changed
+    def update(self, removed, added, row_map=None):
+        touched = set()
+        for row, cell in removed:
+            if cell is None:
+                continue
+            for term in cell_terms(cell):
+                self.term_rows[self.term_ids[term]].remove(row)
+                touched.add(term)
+        if row_map is not None:
+            self.term_rows = [[row_map[r] for r in rows] for rows in self.term_rows]
+        for row, cell in added:
+            if cell is None:
+                continue
+            for term in cell_terms(cell):
+                tid = self.term_ids.get(term)
+                if tid is None:
+                    tid = self.term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                    self.term_rows.append([])
+                    i = bisect_left(self.forward, term)
+                    self.forward.insert(i, term)
+                    self.forward_ids.insert(i, tid)
+                    i = bisect_left(self.backward, term[::-1])
+                    self.backward.insert(i, term[::-1])
+                    self.backward_ids.insert(i, tid)
+                    self._add_grams(tid, term)
+                insort(self.term_rows[tid], row)
+                touched.add(term)
+        return touched
+
+    def exact(self, s):
+        tid = self.term_ids.get(s)
+        return [] if tid is None else [tid]
+
+    def prefix(self, s):
+        return self._walk(self.forward, self.forward_ids, s)
+
+    def suffix(self, s):
+        return self._walk(self.backward, self.backward_ids, s[::-1])
+
+    def infix(self, s):
+        if len(s) < GRAM:
+            # Too short to index; such patterns match most of the column anyway
+            return [tid for tid, term in enumerate(self.terms) if s in term]
+        grams = [self.grams.get(s[i:i + GRAM], ()) for i in range(len(s) - GRAM + 1)]
+        shortest = min(grams, key=len)
+        return [tid for tid in shortest if s in self.terms[tid]]
+
+    @staticmethod
+    def _walk(keys, ids, s):
+        i = bisect_left(keys, s)
+        found = []
+        while i < len(keys) and keys[i].startswith(s):
+            found.append(ids[i])
+            i += 1
+        return found
+
+    # Rows (in dictionary order) of the given terms, skipping terms that
+    # contain any of the excluded substrings
+    def rows(self, term_ids, exclude=()):
+        rows = set()
+        for tid in term_ids:
+            if exclude and any(excl in self.terms[tid] for excl in exclude):
+                continue
+            rows.update(self.term_rows[tid])
+        return sorted(rows)
+
+
+# Distinct search terms of a cell: its '/'-alternates, stripped and lowercased
+def cell_terms(cell):
+    return set(map(normalize, cell_alternates(cell)))